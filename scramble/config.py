@@ -30,10 +30,59 @@ class Config:
     NEO4J_URI: str = f"bolt://{NEO4J_HOST}:7687"
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = os.getenv("NEO4J_PASSWORD", "scR4Mble#Graph!")
+    NEO4J_POOL_SIZE: int = int(os.getenv("NEO4J_POOL_SIZE", "50"))  # Max connections held by the driver
+    NEO4J_ACQUIRE_TIMEOUT: float = float(os.getenv("NEO4J_ACQUIRE_TIMEOUT", "30"))  # Seconds to wait for a free connection
+    NEO4J_MAX_LIFETIME: float = float(os.getenv("NEO4J_MAX_LIFETIME", "3600"))  # Seconds before a connection is recycled
+    NEO4J_POOL_WARM: int = int(os.getenv("NEO4J_POOL_WARM", "8"))  # Sessions opened at startup
+    NEO4J_READY_DEADLINE: float = float(os.getenv("NEO4J_READY_DEADLINE", "15"))  # Seconds to wait for a cold server at startup
+    NEO4J_WRITE_BATCH: int = int(os.getenv("NEO4J_WRITE_BATCH", "50"))  # Entry nodes per UNWIND write
+    NEO4J_FLUSH_INTERVAL: float = float(os.getenv("NEO4J_FLUSH_INTERVAL", "0.5"))  # Seconds between background flushes
+    
+    # Milvus vector index settings
+    MILVUS_INDEX_TYPE: str = os.getenv("MILVUS_INDEX_TYPE", "HNSW_SQ")  # HNSW over quantized vectors
+    MILVUS_SQ_TYPE: str = os.getenv("MILVUS_SQ_TYPE", "SQ8")  # 1 byte per dimension instead of 4; FP16 halves it
+    MILVUS_PQ_M: int = int(os.getenv("MILVUS_PQ_M", "48"))  # PQ sub-vectors for HNSW_PQ/IVF_PQ; must divide the dimension
+    MILVUS_PQ_NBITS: int = int(os.getenv("MILVUS_PQ_NBITS", "8"))  # Bits per PQ code
+    MILVUS_IVF_NLIST: int = int(os.getenv("MILVUS_IVF_NLIST", "1024"))  # Clusters for IVF_* indexes
+    MILVUS_IVF_NPROBE: int = int(os.getenv("MILVUS_IVF_NPROBE", "16"))  # Clusters scanned per IVF_* search
+    MILVUS_METRIC_TYPE: str = os.getenv("MILVUS_METRIC_TYPE", "IP")  # Vectors are stored unit-length, so IP == cosine
+    HNSW_M: int = int(os.getenv("HNSW_M", "16"))
+    HNSW_EF_CONSTRUCTION: int = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+    HNSW_EF: int = int(os.getenv("HNSW_EF", "64"))  # Search-time candidate list size
+    MILVUS_TS_INDEX_TYPE: str = os.getenv("MILVUS_TS_INDEX_TYPE", "INVERTED")  # STL_SORT on a Milvus server; Lite only has INVERTED
+    MILVUS_RECENT_WINDOW_HOURS: float = float(os.getenv("MILVUS_RECENT_WINDOW_HOURS", "1"))  # First window get_recent_entries scans; widened until it holds enough rows
     
     # Redis settings
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_POOL_SIZE: int = int(os.getenv("REDIS_POOL_SIZE", "32"))  # Max connections in the shared pool
+    REDIS_HEALTH_CHECK_INTERVAL: int = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))  # Seconds idle before a connection is pinged
+    
+    # Embedding settings
+    EMBED_CACHE_SIZE: int = int(os.getenv("EMBED_CACHE_SIZE", "4096"))  # Vectors kept in the LRU cache
+    EMBED_DISK_CACHE_SIZE: int = int(os.getenv("EMBED_DISK_CACHE_SIZE", "0"))  # Vectors persisted across restarts; 0 disables
+    EMBED_CACHE_DIR: Path = MAGICSCROLL_DIR / "embed_cache"
+    EMBED_PIPELINE_BATCH: int = int(os.getenv("EMBED_PIPELINE_BATCH", "32"))  # Entries per embed/insert step in bulk saves
+    TEI_URL: Optional[str] = os.getenv("TEI_URL")  # e.g. http://localhost:8080; unset embeds in-process
+    TEI_BATCH_SIZE: int = int(os.getenv("TEI_BATCH_SIZE", "32"))
+    USE_ONNX_INT8_EMBED: bool = bool(os.getenv("USE_ONNX_INT8_EMBED", ""))  # Needs onnxruntime + tokenizers
+    ONNX_EMBED_DIR: Path = Path(os.getenv("ONNX_EMBED_DIR", str(MAGICSCROLL_DIR / "minilm-int8")))
+    
+    # Write buffer settings
+    WRITE_BATCH_SIZE: int = int(os.getenv("WRITE_BATCH_SIZE", "64"))  # Max entries per coalesced save
+    WRITE_FLUSH_INTERVAL_MS: float = float(os.getenv("WRITE_FLUSH_INTERVAL_MS", "25"))  # Wait for more writes
+    
+    # Conversation search cache settings
+    SEARCH_CACHE_THRESHOLD: float = float(os.getenv("SEARCH_CACHE_THRESHOLD", "0.95"))  # Cosine similarity for a hit
+    SEARCH_CACHE_TTL: float = float(os.getenv("SEARCH_CACHE_TTL", "300"))  # Seconds
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+    
+    # Entry lookup cache settings
+    ENTRY_CACHE_SIZE: int = int(os.getenv("ENTRY_CACHE_SIZE", "1024"))
+    ENTRY_CACHE_TTL: float = float(os.getenv("ENTRY_CACHE_TTL", "60"))  # Seconds
+    
+    # FIPA message storage settings
+    FIPA_BUSY_TIMEOUT_MS: int = int(os.getenv("FIPA_BUSY_TIMEOUT_MS", "5000"))  # Wait for another writer's commit; 0 fails at once
     
     # Mock LLM settings
     DISABLE_MOCK_LLM: bool = bool(os.getenv("DISABLE_MOCK_LLM", "true"))
@@ -53,6 +102,16 @@ class Config:
         }
         return config
 
+    @classmethod
+    def get_neo4j_driver_options(cls) -> Dict[str, Any]:
+        """Get connection pool options for the Neo4j driver"""
+        return {
+            "max_connection_pool_size": cls.NEO4J_POOL_SIZE,
+            "connection_acquisition_timeout": cls.NEO4J_ACQUIRE_TIMEOUT,
+            "max_connection_lifetime": cls.NEO4J_MAX_LIFETIME,
+            "keep_alive": True
+        }
+
     @classmethod
     def get_redis_config(cls) -> Dict[str, Any]:
         """Get Redis configuration"""
@@ -62,6 +121,16 @@ class Config:
             "db": cls.REDIS_DB
         }
         return config
+
+    @classmethod
+    def get_redis_pool_options(cls) -> Dict[str, Any]:
+        """Get connection pool options for Redis clients"""
+        return {
+            "max_connections": cls.REDIS_POOL_SIZE,
+            "health_check_interval": cls.REDIS_HEALTH_CHECK_INTERVAL,
+            "socket_keepalive": True,
+            "retry_on_timeout": True
+        }
         
     @classmethod
     def ensure_directory_structure(cls) -> None:
@@ -304,7 +304,7 @@ class EnhancedCoordinator(Coordinator):
             # Try to save
             try:
                 logger.info("Saving conversation to MagicScroll...")
-                entry_id = await self.magicscroll.save_ms_entry(conversation)
+                entry_id = await self.magicscroll.queue_ms_entry(conversation)
                 logger.info(f"Conversation saved with ID: {entry_id}")
                 
                 # Reset conversation
@@ -2,6 +2,7 @@
 from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, UTC
+import asyncio
 import re
 from scramble.utils.logging import get_logger
 from scramble.magicscroll.magic_scroll import MagicScroll
@@ -110,16 +111,22 @@ class MessageEnricher:
                 logger.info("No triggers or temporal references found - skipping enrichment")
                 return EnrichedContext()
                 
+            # Topic and temporal lookups are independent searches that fill
+            # separate parts of the context, so run them concurrently
+            lookups = []
+            
             # Add topic context based on memory triggers
             if memory_matches:
                 extracted_topics = self._extract_topics_from_matches(message, memory_matches)
                 logger.debug(f"Extracted topics: {extracted_topics}")
-                await self._add_topic_context(message, extracted_topics, context)
+                lookups.append(self._add_topic_context(message, extracted_topics, context))
             
             # Add temporal context
             if temporal_refs:
                 logger.debug(f"Found temporal references: {temporal_refs}")
-                await self._add_temporal_context(temporal_refs, context)
+                lookups.append(self._add_temporal_context(temporal_refs, context))
+                
+            await asyncio.gather(*lookups)
             
             # If we found relevant context and have an active conversation, add the enriched context
             if (context.topic_discussions or context.temporal_context) and active_conversation:
@@ -5,14 +5,16 @@ Applies schema files in numerical order from the schema directory
 """
 
 import os
+import random
 import time
 from neo4j import GraphDatabase
 from pathlib import Path
 import logging
 
-def wait_for_neo4j(uri, max_attempts=30, delay=2):
+def wait_for_neo4j(uri, max_attempts=30, initial_delay=0.1, max_delay=2.0):
     """Wait for Neo4j to become available"""
     driver = GraphDatabase.driver(uri)
+    delay = initial_delay
     for attempt in range(max_attempts):
         try:
             with driver.session() as session:
@@ -21,7 +23,9 @@ def wait_for_neo4j(uri, max_attempts=30, delay=2):
                 return driver
         except Exception as e:
             print(f"Waiting for Neo4j (attempt {attempt + 1}/{max_attempts})...")
-            time.sleep(delay)
+            # Exponential backoff with jitter so parallel starters don't retry in lockstep
+            time.sleep(delay + random.uniform(0, delay / 2))
+            delay = min(delay * 2, max_delay)
     raise Exception("Neo4j failed to become available")
 
 def apply_schema_file(driver, schema_file):
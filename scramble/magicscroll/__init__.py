@@ -6,3 +6,4 @@ from .ms_milvus_store import MSMilvusStore
 from .ms_search import MSSearch
 from .ms_types import SearchResult
 from .ms_fipa import MSFIPAStorage
+from .ms_embedding import CachedEmbedding, EmbeddingDiskCache, ONNXMiniLMEmbedding, TEIEmbedding
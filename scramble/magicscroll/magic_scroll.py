@@ -1,21 +1,93 @@
 """Core MagicScroll system providing simple storage and search capabilities."""
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
+from collections import OrderedDict
 from datetime import datetime
+import asyncio
+import io
 import os
+import time
 
 from llama_index.core import Settings
 from llama_index.core.node_parser import SentenceSplitter
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
 from .ms_entry import MSEntry, EntryType, MSConversation
+from .ms_embedding import CachedEmbedding, EmbeddingDiskCache, ONNXMiniLMEmbedding, TEIEmbedding
 from .ms_milvus_store import MSMilvusStore
 from .ms_types import SearchResult
 from .ms_fipa import MSFIPAStorage
+from .ms_search import SemanticSearchCache
 from scramble.utils.logging import get_logger
 from scramble.config import Config
 
 logger = get_logger(__name__)
 
+# Shared result for lookups on an uninitialized scroll; callers only iterate it
+_EMPTY: tuple = ()
+
+_HuggingFaceEmbedding: Optional[type] = None
+
+def _get_hf_embedding_class() -> type:
+    """Import HuggingFaceEmbedding on first use; it drags in torch and transformers."""
+    global _HuggingFaceEmbedding
+    if _HuggingFaceEmbedding is None:
+        from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+        _HuggingFaceEmbedding = HuggingFaceEmbedding
+    return _HuggingFaceEmbedding
+
+# Process-wide models shared by every MagicScroll instance
+_SPLITTER: Optional[SentenceSplitter] = None
+_EMBED_MODEL: Optional[CachedEmbedding] = None
+_SHARED_LOCK = asyncio.Lock()
+
+def _load_embed_model() -> Any:
+    """Build the configured embedding backend."""
+    if Config.TEI_URL:
+        # Offload the forward pass to a Text-Embeddings-Inference server
+        logger.info(f"Using TEI embedding server at {Config.TEI_URL}")
+        return TEIEmbedding(
+            Config.TEI_URL,
+            embed_batch_size=Config.TEI_BATCH_SIZE
+        )
+    if Config.USE_ONNX_INT8_EMBED:
+        # Quantized MiniLM on onnxruntime's int8 CPU kernels
+        logger.info(f"Using int8 ONNX embedding model from {Config.ONNX_EMBED_DIR}")
+        return ONNXMiniLMEmbedding(Config.ONNX_EMBED_DIR)
+    # Use local embedding model with significantly smaller footprint
+    return _get_hf_embedding_class()(
+        model_name="all-MiniLM-L6-v2",  # Much smaller and widely available
+        embed_batch_size=10
+    )
+
+class _EntryCache:
+    """Small LRU of recently fetched entries, each valid for `ttl` seconds."""
+    
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, MSEntry]]" = OrderedDict()
+
+    def get(self, entry_id: str) -> Optional[MSEntry]:
+        """Return a cached entry that has not expired."""
+        item = self._entries.get(entry_id)
+        if item is None:
+            return None
+        if time.monotonic() - item[0] > self.ttl:
+            del self._entries[entry_id]
+            return None
+        self._entries.move_to_end(entry_id)
+        return item[1]
+
+    def put(self, entry: MSEntry) -> None:
+        """Cache an entry, evicting the least recently used one when full."""
+        self._entries[entry.id] = (time.monotonic(), entry)
+        self._entries.move_to_end(entry.id)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, entry_id: str) -> None:
+        """Forget an entry."""
+        self._entries.pop(entry_id, None)
+
 class MagicScroll:
     """Core system for storing and searching chat conversations with context enrichment."""
     
@@ -24,6 +96,15 @@ class MagicScroll:
         self.ms_store = None
         self.search_engine = None
         self.fipa_storage = MSFIPAStorage()
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._write_flusher: Optional[asyncio.Task] = None
+        self._search_cache = SemanticSearchCache(
+            threshold=Config.SEARCH_CACHE_THRESHOLD,
+            ttl=Config.SEARCH_CACHE_TTL,
+            max_size=Config.SEARCH_CACHE_SIZE
+        )
+        # Thread assembly re-reads the same parent entries over and over
+        self._entry_cache = _EntryCache(Config.ENTRY_CACHE_SIZE, Config.ENTRY_CACHE_TTL)
 
     @classmethod 
     async def create(cls) -> 'MagicScroll':
@@ -37,46 +118,25 @@ class MagicScroll:
         try:
             logger.info("Initializing MagicScroll with Milvus Lite storage...")
             
-            # Set up llama-index settings to use local embeddings
-            try:
-                logger.info("Setting up embedding model...")
-                # Use local embedding model with significantly smaller footprint
-                embed_model = HuggingFaceEmbedding(
-                    model_name="all-MiniLM-L6-v2",  # Much smaller and widely available
-                    embed_batch_size=10
-                )
-                Settings.embed_model = embed_model
-                
-                # Add node parser for chunking
-                Settings.node_parser = SentenceSplitter(
-                    chunk_size=1024, 
-                    chunk_overlap=50
-                )
-                
-                logger.info("Embedding model loaded successfully")
-            except Exception as model_err:
-                logger.warning(f"Embedding model load failed: {str(model_err)}")
-                logger.warning("Will operate with reduced functionality")
-                
-                # Set a fallback if needed
-                try:
-                    from llama_index.embeddings.base import SimilarityMode
-                    from llama_index.embeddings.utils import FakeEmbedding
-                    
-                    # Create a fake embedding model for testing
-                    fake_embed = FakeEmbedding(dim=384, similarity_mode=SimilarityMode.EUCLIDEAN)
-                    Settings.embed_model = fake_embed
-                    logger.info("Using fake embeddings for testing")
-                except Exception:
-                    pass
-                
-            # Initialize the Milvus store
-            self.ms_store = await MSMilvusStore.create()
+            # Model loading and store startup are independent; overlap them
+            results = await asyncio.gather(
+                self._init_embeddings(),
+                self._init_store(),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
             
             # Initialize the search engine
             from .ms_search import MSSearch
             self.search_engine = MSSearch(self)
             
+            # Coalesce queued writes into batched saves
+            if self._write_flusher is None:
+                self._write_queue = asyncio.Queue()
+                self._write_flusher = asyncio.create_task(self._flush_writes())
+            
             logger.info("MagicScroll ready to unroll!")
         
         except Exception as e:
@@ -85,52 +145,181 @@ class MagicScroll:
             self.ms_store = None
             self.search_engine = None
             logger.warning("MagicScroll running in minimal mode")
+
+    async def _init_embeddings(self) -> None:
+        """Set up llama-index settings to use local embeddings."""
+        global _SPLITTER, _EMBED_MODEL
+        try:
+            logger.info("Setting up embedding model...")
+            async with _SHARED_LOCK:
+                if _EMBED_MODEL is None:
+                    # Loading weights is blocking; keep the event loop free for the store
+                    _EMBED_MODEL = await asyncio.to_thread(_build_embed_model)
+                if _SPLITTER is None:
+                    # Add node parser for chunking
+                    _SPLITTER = SentenceSplitter(
+                        chunk_size=1024, 
+                        chunk_overlap=50
+                    )
+            Settings.embed_model = _EMBED_MODEL
+            Settings.node_parser = _SPLITTER
+            
+            logger.info("Embedding model loaded successfully")
+        except Exception as model_err:
+            # Placeholder vectors would be written into the persistent store,
+            # so a failed load leaves the scroll in minimal mode instead
+            logger.error(f"Embedding model load failed: {str(model_err)}")
+            raise
+
+    async def _init_store(self) -> None:
+        """Initialize the Milvus store."""
+        # Opening Milvus Lite starts a local server; run it off the event loop
+        self.ms_store = await asyncio.to_thread(MSMilvusStore)
         
     async def save_ms_entry(self, entry: MSEntry) -> str:
         """Save an entry through the store."""
-        if not self.ms_store:
+        store = self.ms_store
+        if not store:
             logger.warning("Cannot save entry - MagicScroll store not initialized")
             return entry.id  # Return ID but don't save
 
+        # The store handles its own errors and reports failure as False
+        if not await store.save_ms_entry(entry):
+            logger.error("Failed to write entry to store")
+            return entry.id  # Return ID even if save failed
+        
+        # New content can change what a search should return
+        self._search_cache.clear()
+        self._entry_cache.pop(entry.id)
+        
+        logger.info(f"Successfully saved entry {entry.id} to store")
+        return entry.id
+
+    async def save_ms_entries(self, entries: List[MSEntry]) -> List[str]:
+        """Save several entries through the store in one batch."""
+        store = self.ms_store
+        if not store:
+            logger.warning("Cannot save entries - MagicScroll store not initialized")
+            return [entry.id for entry in entries]
+
+        forget = self._entry_cache.pop
+        for entry in entries:
+            forget(entry.id)
         try:
-            if not await self.ms_store.save_ms_entry(entry):
-                logger.error("Failed to write entry to store")
-                return entry.id  # Return ID even if save failed
-            
-            logger.info(f"Successfully saved entry {entry.id} to store")
-            return entry.id
+            if not await store.save_ms_entries(entries):
+                logger.error("Failed to write entry batch to store")
+            else:
+                self._search_cache.clear()
+                logger.info(f"Successfully saved {len(entries)} entries to store")
         except Exception as e:
-            logger.error(f"Error saving entry: {e}")
-            return entry.id
+            logger.error(f"Error saving entry batch: {e}")
+        return [entry.id for entry in entries]
+
+    async def queue_ms_entry(self, entry: MSEntry) -> str:
+        """Save an entry through the write buffer, batched with concurrent writes."""
+        flusher = self._write_flusher
+        if flusher is None or flusher.done():
+            return await self.save_ms_entry(entry)
+            
+        done = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((entry, done))
+        return await done
+
+    async def _flush_writes(self) -> None:
+        """Drain queued entries into save_ms_entries batches."""
+        queue = self._write_queue
+        loop = asyncio.get_running_loop()
+        window = Config.WRITE_FLUSH_INTERVAL_MS / 1000
+        batch_size = Config.WRITE_BATCH_SIZE
+        
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + window
+            # Keep collecting until the batch is full or the window closes
+            while len(batch) < batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+                    
+            try:
+                await self.save_ms_entries([entry for entry, _ in batch])
+            finally:
+                for entry, done in batch:
+                    if not done.done():
+                        done.set_result(entry.id)
+                    queue.task_done()
 
     async def get_ms_entry(self, entry_id: str) -> Optional[MSEntry]:
         """Get an entry from the store."""
-        if not self.ms_store:
+        store = self.ms_store
+        if not store:
             logger.warning("Cannot retrieve entry - MagicScroll store not initialized")
             return None
             
-        try:
-            entry = await self.ms_store.get_ms_entry(entry_id)
-            if entry:
-                logger.info(f"Successfully retrieved entry {entry_id}")
-            else:
-                logger.warning(f"Entry {entry_id} not found in store")
+        cache = self._entry_cache
+        entry = cache.get(entry_id)
+        if entry is not None:
             return entry
-        except Exception as e:
-            logger.error(f"Error retrieving entry: {e}")
-            return None
+            
+        # The store handles its own errors and reports failure as None
+        entry = await store.get_ms_entry(entry_id)
+        if entry:
+            cache.put(entry)
+            logger.info(f"Successfully retrieved entry {entry_id}")
+        else:
+            logger.warning(f"Entry {entry_id} not found in store")
+        return entry
+
+    async def get_ms_entries(self, entry_ids: List[str]) -> List[Optional[MSEntry]]:
+        """Get several entries from the store in one round trip."""
+        store = self.ms_store
+        if not store:
+            logger.warning("Cannot retrieve entries - MagicScroll store not initialized")
+            return [None] * len(entry_ids)
+            
+        # Bound once; both loops below run per id
+        cache_get = self._entry_cache.get
+        cache_put = self._entry_cache.put
+        entries = [cache_get(entry_id) for entry_id in entry_ids]
+        missing = [entry_id for entry_id, entry in zip(entry_ids, entries) if entry is None]
+        if not missing:
+            return entries
+            
+        if hasattr(store, 'get_ms_entries'):
+            fetched = await store.get_ms_entries(missing)
+        else:
+            # Stores without a batched lookup still fetch every entry concurrently
+            fetched = await asyncio.gather(
+                *(store.get_ms_entry(entry_id) for entry_id in missing)
+            )
+            
+        by_id = {}
+        for entry in fetched:
+            if entry:
+                cache_put(entry)
+                by_id[entry.id] = entry
+        return [entry if entry is not None else by_id.get(entry_id)
+                for entry_id, entry in zip(entry_ids, entries)]
 
     async def search(
         self,
         query: str,
         entry_types: Optional[List[EntryType]] = None,
         temporal_filter: Optional[Dict[str, datetime]] = None,
-        limit: int = 5
-    ) -> List[SearchResult]:
-        """Search entries in the scroll using vector search."""
-        if not self.search_engine:
+        limit: int = 5,
+        ef_search: Optional[int] = None
+    ) -> Sequence[SearchResult]:
+        """Search entries in the scroll using vector search.
+        
+        `ef_search` widens or narrows the HNSW candidate list for this query only.
+        """
+        if self.search_engine is None:
             logger.warning("Search engine not available")
-            return []
+            return _EMPTY
             
         try:
             logger.info(f"Searching with query: '{query}', limit={limit}")
@@ -138,35 +327,74 @@ class MagicScroll:
                 logger.info(f"Filtering by entry types: {[t.value for t in entry_types]}")
             if temporal_filter:
                 logger.info(f"Filtering by time window: {temporal_filter}")
+            
+            # Repeated and near-duplicate queries with the same filters reuse earlier
+            # results; the embedding itself comes from the embedding cache
+            params = (
+                "search",
+                tuple(t.value for t in entry_types) if entry_types is not None else None,
+                tuple(sorted(temporal_filter.items())) if temporal_filter else None,
+                limit,
+                ef_search
+            )
+            query_embedding = await self.search_engine.get_embedding(query)
+            if query_embedding:
+                cached = self._search_cache.get(query_embedding, params)
+                if cached is not None:
+                    logger.info(f"Search served {len(cached)} results from cache")
+                    return cached
                 
             # Use MSSearch to perform the search
             results = await self.search_engine.search(
                 query=query,
                 entry_types=entry_types,
                 temporal_filter=temporal_filter,
-                limit=limit
+                limit=limit,
+                ef_search=ef_search
             )
             
+            if query_embedding and results:
+                self._search_cache.put(query_embedding, params, results)
+            
             logger.info(f"Search returned {len(results)} results")
             return results
         except Exception as e:
             logger.error(f"Error in search: {e}")
             return []
 
+    async def search_many(self, queries: List[str], limit: int = 5) -> List[Sequence[SearchResult]]:
+        """Search for several queries at once, returning one result list per query."""
+        if self.search_engine is None:
+            logger.warning("Search engine not available")
+            return [_EMPTY] * len(queries)
+        if not queries:
+            return []
+            
+        return await self.search_engine.search_many(queries, limit)
+
     async def search_conversation(
         self,
         message: str,
         temporal_filter: Optional[Dict[str, datetime]] = None,
         limit: int = 3
-    ) -> List[SearchResult]:
+    ) -> Sequence[SearchResult]:
         """Search for conversation context using semantic similarity."""
-        if not self.search_engine:
+        if self.search_engine is None:
             logger.warning("Search engine not available")
-            return []
+            return _EMPTY
             
         try:
             logger.info(f"Searching for conversation context with: '{message[:50]}...'")
             
+            # Near-duplicate probes with the same parameters reuse earlier results
+            params = ("conversation", limit, tuple(sorted(temporal_filter.items())) if temporal_filter else None)
+            query_embedding = await self.search_engine.get_embedding(message)
+            if query_embedding:
+                cached = self._search_cache.get(query_embedding, params)
+                if cached is not None:
+                    logger.info(f"Conversation search served {len(cached)} results from cache")
+                    return cached
+            
             # Use MSSearch's conversation-optimized search
             results = await self.search_engine.conversation_context_search(
                 message=message,
@@ -174,6 +402,9 @@ class MagicScroll:
                 limit=limit
             )
             
+            if query_embedding and results:
+                self._search_cache.put(query_embedding, params, results)
+            
             logger.info(f"Conversation search returned {len(results)} results")
             return results
         except Exception as e:
@@ -185,11 +416,11 @@ class MagicScroll:
         hours: Optional[int] = None,
         entry_types: Optional[List[EntryType]] = None,
         limit: int = 10
-    ) -> List[MSEntry]:
+    ) -> Sequence[MSEntry]:
         """Get recent entries."""
-        if not self.ms_store or not hasattr(self.ms_store, 'get_recent_entries'):
+        if self.ms_store is None:
             logger.warning("Recent entries retrieval not available")
-            return []
+            return _EMPTY
             
         try:
             entries = await self.ms_store.get_recent_entries(hours, entry_types, limit)
@@ -198,6 +429,18 @@ class MagicScroll:
             logger.error(f"Error retrieving recent entries: {e}")
             return []
 
+    async def count_by_type(self, hours: Optional[int] = None) -> Dict[str, int]:
+        """Count entries per entry type without loading them."""
+        if self.ms_store is None:
+            logger.warning("Entry counts not available")
+            return {}
+            
+        try:
+            return await self.ms_store.count_by_type(hours)
+        except Exception as e:
+            logger.error(f"Error counting entries: {e}")
+            return {}
+
     # FIPA-related methods
     def create_fipa_conversation(self, metadata=None):
         """Create a new FIPA conversation."""
@@ -210,6 +453,10 @@ class MagicScroll:
             conversation_id, sender, receiver, content, performative, metadata
         )
     
+    def save_fipa_messages(self, conversation_id, messages):
+        """Save several FIPA messages in one transaction."""
+        return self.fipa_storage.save_messages(conversation_id, messages)
+    
     def get_fipa_conversation(self, conversation_id, include_ephemeral=False):
         """Get messages from a FIPA conversation."""
         return self.fipa_storage.get_filtered_conversation(
@@ -238,21 +485,107 @@ class MagicScroll:
         )
         
         # Add to the index
-        return await self.save_ms_entry(entry)
+        return await self.queue_ms_entry(entry)
+    
+    async def save_fipa_messages_bulk(self, conversation_id, metadata=None):
+        """Save each filtered FIPA message as its own MagicScroll entry.
+        
+        Longer conversations go through the batched store path, so every
+        message is embedded in one batch and written in one insert.
+        """
+        messages = self.fipa_storage.get_filtered_conversation(conversation_id)
+        
+        entries = [
+            MSConversation(
+                content=self._format_fipa_conversation([msg]),
+                metadata={
+                    "fipa_conversation_id": conversation_id,
+                    "fipa_message_id": msg["message_id"],
+                    "sender": msg["sender"],
+                    "receiver": msg["receiver"],
+                    "performative": msg["performative"],
+                    "timestamp": msg["timestamp"],
+                    **(metadata or {})
+                }
+            )
+            for msg in messages
+        ]
+        
+        # A handful of messages joins the write buffer's next batch instead
+        if len(entries) < 4:
+            return list(await asyncio.gather(*(self.queue_ms_entry(entry) for entry in entries)))
+        return await self.save_ms_entries(entries)
     
     def _format_fipa_conversation(self, messages):
         """Format FIPA messages into a storable conversation format."""
-        formatted = []
+        # Write straight into one buffer instead of building a string per message
+        buf = io.StringIO()
+        write = buf.write
+        first = True
         
         for msg in messages:
-            sender = msg["sender"]
-            content = msg["content"]
-            formatted.append(f"{sender}: {content}")
+            if not first:
+                write("\n\n")
+            write(msg["sender"])
+            write(": ")
+            write(msg["content"])
+            first = False
             
-        return "\n\n".join(formatted)
+        return buf.getvalue()
 
     async def close(self) -> None:
         """Close connections."""
+        flusher = self._write_flusher
+        if flusher is not None:
+            queue = self._write_queue
+            self._write_flusher = None
+            self._write_queue = None
+            # Let queued writes land before stopping the flusher, but stop
+            # waiting if it has died, since then nothing drains the queue
+            drained = asyncio.ensure_future(queue.join())
+            await asyncio.wait({drained, flusher}, return_when=asyncio.FIRST_COMPLETED)
+            drained.cancel()
+            flusher.cancel()
+            
+            # Writes the flusher never picked up are saved directly
+            leftover = []
+            while not queue.empty():
+                leftover.append(queue.get_nowait())
+            if leftover:
+                await self.save_ms_entries([entry for entry, _ in leftover])
+                for entry, done in leftover:
+                    if not done.done():
+                        done.set_result(entry.id)
+            
         if self.ms_store and hasattr(self.ms_store, 'close'):
             await self.ms_store.close()
             logger.info("MagicScroll connections closed")
+            
+        self.fipa_storage.close()
+
+    @staticmethod
+    def shutdown_shared() -> None:
+        """Close the store clients shared by all MagicScroll instances."""
+        MSMilvusStore.close_shared_clients()
+        if _EMBED_MODEL is not None:
+            _EMBED_MODEL.close()
+        logger.info("MagicScroll shared connections closed")
+
+def _build_embed_model() -> CachedEmbedding:
+    """Load the configured backend and wrap it in the embedding caches."""
+    embed_model = _load_embed_model()
+    disk_cache = None
+    if Config.EMBED_DISK_CACHE_SIZE > 0:
+        # Warm restarts reuse vectors computed by earlier runs
+        disk_cache = EmbeddingDiskCache(
+            Config.EMBED_CACHE_DIR,
+            capacity=Config.EMBED_DISK_CACHE_SIZE,
+            dim=384,
+            model_name=embed_model.model_name
+        )
+    # Repeated content skips the forward pass
+    return CachedEmbedding(
+        embed_model,
+        max_size=Config.EMBED_CACHE_SIZE,
+        disk_cache=disk_cache
+    )
@@ -0,0 +1,451 @@
+"""Embedding model wrappers for MagicScroll."""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import threading
+
+import httpx
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from pydantic import PrivateAttr
+
+from scramble.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Prefixes keep query and document embeddings apart - some models embed them differently
+_QUERY_PREFIX = b"q:"
+_TEXT_PREFIX = b"t:"
+
+
+def content_key(text: str, prefix: bytes = _TEXT_PREFIX) -> bytes:
+    """Hash text into a compact cache key."""
+    return hashlib.blake2b(prefix + text.encode("utf-8"), digest_size=16).digest()
+
+
+# Content keys are 16-byte digests; an all-zero slot is empty
+_KEY_SIZE = 16
+_EMPTY_KEY = bytes(_KEY_SIZE)
+
+
+class EmbeddingDiskCache:
+    """Fixed-size on-disk ring of float16 vectors, memory-mapped across restarts.
+
+    Vectors live in `emb.f16` and each row's content key in `keys.bin`, so
+    reads check the key they find next to the vector. Another instance on the
+    same directory can overwrite a row; the reader then sees a different key
+    and treats it as a miss. `index.json` only holds the shape and the ring
+    cursor and is written on close().
+    """
+
+    def __init__(self, cache_dir: Path, capacity: int, dim: int, model_name: str):
+        """Open (or create) the cache files in cache_dir."""
+        self.cache_dir = Path(cache_dir)
+        self.capacity = capacity
+        self.dim = dim
+        self.model_name = model_name
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._index_path = self.cache_dir / "index.json"
+        vectors_path = self.cache_dir / "emb.f16"
+        keys_path = self.cache_dir / "keys.bin"
+
+        self._lock = threading.Lock()
+        self._next = 0
+        index = self._read_index()
+        # A different model or shape makes every stored vector useless
+        reuse = (
+            vectors_path.exists()
+            and keys_path.exists()
+            and index.get("model_name") == model_name
+            and index.get("dim") == dim
+            and index.get("capacity") == capacity
+        )
+        if reuse:
+            self._next = index.get("next", 0) % capacity
+        else:
+            self._write_index()  # Claim the directory for this shape before the files are reset
+
+        mode = "r+" if reuse else "w+"
+        self._vectors = np.memmap(vectors_path, dtype=np.float16, mode=mode, shape=(capacity, dim))
+        self._keys = np.memmap(keys_path, dtype=np.uint8, mode=mode, shape=(capacity, _KEY_SIZE))
+        self._rows: Dict[bytes, int] = {}
+        for row in range(capacity):
+            key = self._keys[row].tobytes()
+            if key != _EMPTY_KEY:
+                self._rows[key] = row
+        atexit.register(self.close)
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key: bytes) -> Optional[Embedding]:
+        """Return the stored vector for key, if present."""
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            stored_key = self._keys[row]
+            if stored_key.tobytes() != key:
+                # Overwritten by another instance sharing the directory
+                del self._rows[key]
+                return None
+            embedding = self._vectors[row].astype(np.float32)
+            # Re-check so a vector replaced mid-read is never returned
+            if stored_key.tobytes() != key:
+                del self._rows[key]
+                return None
+        return embedding.tolist()
+
+    def put_many(self, items: List[Tuple[bytes, Embedding]]) -> None:
+        """Write vectors into the next rows, overwriting the oldest.
+
+        Only the memory map is touched, so a miss costs a row copy rather
+        than a file write; the OS writes pages back, and close() flushes them.
+        """
+        with self._lock:
+            for key, embedding in items:
+                if key in self._rows or len(embedding) != self.dim:
+                    continue
+                row = self._next
+                evicted = self._keys[row].tobytes()
+                if evicted != _EMPTY_KEY:
+                    self._rows.pop(evicted, None)
+                # Clear the key first so no reader pairs it with a half-written vector
+                self._keys[row] = 0
+                self._vectors[row] = embedding
+                self._keys[row] = np.frombuffer(key, dtype=np.uint8)
+                self._rows[key] = row
+                self._next = (row + 1) % self.capacity
+
+    def close(self) -> None:
+        """Flush the memory maps and save the ring cursor."""
+        with self._lock:
+            self._vectors.flush()
+            self._keys.flush()
+            self._write_index()
+
+    def _write_index(self) -> None:
+        """Atomically replace index.json."""
+        tmp_path = self._index_path.with_name(f"index.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "model_name": self.model_name,
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "next": self._next
+            }, f)
+        os.replace(tmp_path, self._index_path)
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Wraps an embedding model with an in-process LRU cache keyed by content hash.
+
+    The wrapped model is deterministic for its lifetime, so repeated text
+    (system prompts, FIPA headers, duplicated messages) skips the forward pass.
+    An optional EmbeddingDiskCache backs the LRU so warm restarts skip it too.
+    The LRU is locked, since batch saves embed in worker threads while the
+    event loop embeds queries.
+    """
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _cache: "OrderedDict[bytes, Embedding]" = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _max_size: int = PrivateAttr()
+    _disk_cache: Optional[EmbeddingDiskCache] = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        max_size: int = 4096,
+        disk_cache: Optional[EmbeddingDiskCache] = None,
+        **kwargs
+    ) -> None:
+        """Initialize with the model to wrap and the maximum number of cached vectors."""
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            **kwargs
+        )
+        self._embed_model = embed_model
+        self._cache = OrderedDict()
+        self._max_size = max_size
+        self._disk_cache = disk_cache
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def embed_model(self) -> BaseEmbedding:
+        """The wrapped embedding model."""
+        return self._embed_model
+
+    def _lookup(self, key: bytes) -> Optional[Embedding]:
+        """Return a cached vector and mark it as recently used."""
+        with self._lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+                return embedding
+        if self._disk_cache is not None:
+            embedding = self._disk_cache.get(key)
+            if embedding is not None:
+                self._remember(key, embedding)
+        return embedding
+
+    def _remember(self, key: bytes, embedding: Embedding) -> None:
+        """Put a vector in the in-memory LRU, evicting the oldest entry when full."""
+        with self._lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+
+    def _store(self, key: bytes, embedding: Embedding) -> None:
+        """Cache a freshly computed vector in memory and on disk."""
+        self._remember(key, embedding)
+        if self._disk_cache is not None:
+            self._disk_cache.put_many([(key, embedding)])
+
+    def close(self) -> None:
+        """Persist the disk cache, if there is one."""
+        if self._disk_cache is not None:
+            self._disk_cache.close()
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        key = content_key(query, _QUERY_PREFIX)
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = self._embed_model._get_query_embedding(query)
+            self._store(key, embedding)
+        return embedding
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        key = content_key(query, _QUERY_PREFIX)
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = await self._embed_model._aget_query_embedding(query)
+            self._store(key, embedding)
+        return embedding
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        key = content_key(text)
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = self._embed_model._get_text_embedding(text)
+            self._store(key, embedding)
+        return embedding
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        key = content_key(text)
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = await self._embed_model._aget_text_embedding(text)
+            self._store(key, embedding)
+        return embedding
+
+    def _partition(
+        self, texts: List[str]
+    ) -> Tuple[List[bytes], List[Optional[Embedding]], List[int]]:
+        """Split texts into cached results and the positions that still need embedding."""
+        keys = [content_key(text) for text in texts]
+        results: List[Optional[Embedding]] = [self._lookup(key) for key in keys]
+        missing = [i for i, embedding in enumerate(results) if embedding is None]
+        return keys, results, missing
+
+    def _fill(
+        self,
+        keys: List[bytes],
+        results: List[Optional[Embedding]],
+        missing: List[int],
+        embeddings: List[Embedding]
+    ) -> List[Embedding]:
+        """Stitch freshly computed vectors back into their original positions."""
+        for i, embedding in zip(missing, embeddings):
+            results[i] = embedding
+            self._remember(keys[i], embedding)
+        if self._disk_cache is not None:
+            self._disk_cache.put_many([(keys[i], embedding) for i, embedding in zip(missing, embeddings)])
+        return results
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        keys, results, missing = self._partition(texts)
+        if missing:
+            embeddings = self._embed_model._get_text_embeddings([texts[i] for i in missing])
+            self._fill(keys, results, missing, embeddings)
+        return results
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        keys, results, missing = self._partition(texts)
+        if missing:
+            embeddings = await self._embed_model._aget_text_embeddings([texts[i] for i in missing])
+            self._fill(keys, results, missing, embeddings)
+        return results
+
+
+class TEIEmbedding(BaseEmbedding):
+    """Embeds text through a HuggingFace Text-Embeddings-Inference server.
+
+    TEI batches requests and runs the model in optimized native kernels, so the
+    forward pass leaves the Python process entirely. Clients are created lazily
+    and reused for every request.
+    """
+
+    _url: str = PrivateAttr()
+    _timeout: float = PrivateAttr()
+    _client: Optional[httpx.Client] = PrivateAttr(default=None)
+    _aclient: Optional[httpx.AsyncClient] = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        base_url: str,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        embed_batch_size: int = 32,
+        timeout: float = 30.0,
+        **kwargs
+    ) -> None:
+        """Initialize with the TEI server URL, e.g. http://localhost:8080."""
+        super().__init__(model_name=model_name, embed_batch_size=embed_batch_size, **kwargs)
+        self._url = base_url.rstrip("/") + "/embed"
+        self._timeout = timeout
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "TEIEmbedding"
+
+    def _payload(self, texts: List[str]) -> dict:
+        return {"inputs": texts, "truncate": True}
+
+    def _embed(self, texts: List[str]) -> List[Embedding]:
+        if self._client is None:
+            self._client = httpx.Client(timeout=self._timeout)
+        response = self._client.post(self._url, json=self._payload(texts))
+        response.raise_for_status()
+        return response.json()
+
+    async def _aembed(self, texts: List[str]) -> List[Embedding]:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(timeout=self._timeout)
+        response = await self._aclient.post(self._url, json=self._payload(texts))
+        response.raise_for_status()
+        return response.json()
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._embed([query])[0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return (await self._aembed([query]))[0]
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._embed([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aembed([text]))[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._embed(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self._aembed(texts)
+
+    async def aclose(self) -> None:
+        """Close the HTTP clients."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+
+class ONNXMiniLMEmbedding(BaseEmbedding):
+    """Runs an int8-quantized MiniLM export through onnxruntime.
+
+    Expects a directory produced by
+    `optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2
+    --optimize O3 --quantize avx512_vnni <dir>`, holding the quantized model
+    and its `tokenizer.json`. Output is mean-pooled and L2-normalized to match
+    sentence-transformers.
+    """
+
+    _session: Any = PrivateAttr()
+    _tokenizer: Any = PrivateAttr()
+    _input_names: Tuple[str, ...] = PrivateAttr()
+
+    def __init__(
+        self,
+        model_dir: Union[str, Path],
+        model_file: str = "model_quantized.onnx",
+        max_length: int = 256,
+        embed_batch_size: int = 32,
+        **kwargs
+    ) -> None:
+        """Load the ONNX session and fast tokenizer from model_dir."""
+        # Optional dependencies - only needed when this backend is enabled
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        super().__init__(model_name=str(model_dir), embed_batch_size=embed_batch_size, **kwargs)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = os.cpu_count() or 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            str(model_dir / model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = tuple(i.name for i in self._session.get_inputs())
+
+        self._tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()  # Pads to the longest text in each batch
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ONNXMiniLMEmbedding"
+
+    def _embed(self, texts: List[str]) -> List[Embedding]:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        hidden = self._session.run(None, feeds)[0]  # (batch, tokens, dim)
+
+        mask = attention_mask[..., np.newaxis].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._embed([query])[0]
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return (await asyncio.to_thread(self._embed, [query]))[0]
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._embed([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await asyncio.to_thread(self._embed, [text]))[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._embed(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        # onnxruntime releases the GIL, so a worker thread keeps the loop free
+        return await asyncio.to_thread(self._embed, texts)
@@ -1,11 +1,61 @@
 """Domain types for MagicScroll."""
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Dict, Any, Optional
-import uuid
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+import os
+import sys
+import threading
 
-from llama_index.core import Document
+if TYPE_CHECKING:
+    # Imported lazily in to_document(); LlamaIndex is heavy to load
+    from llama_index.core import Document
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; only pack()/unpack() need it
+    msgpack = None
+
+# Random bytes for entry ids, drawn from os.urandom 4 KiB at a time and kept
+# as hex with the UUID4 version/variant bits already set
+_UUID_LOCK = threading.Lock()
+_UUID_POOL = ""
+_UUID_POS = 0
+
+def _reset_uuid_pool() -> None:
+    """Drop the pool so a forked child never reuses its parent's bytes."""
+    global _UUID_POOL, _UUID_POS
+    _UUID_POOL = ""
+    _UUID_POS = 0
+
+if hasattr(os, "register_at_fork"):  # POSIX only; Windows has no fork
+    os.register_at_fork(after_in_child=_reset_uuid_pool)
+
+def _uuid_hex() -> str:
+    """Return a random UUID4 string, like str(uuid.uuid4()) without the UUID object."""
+    global _UUID_POOL, _UUID_POS
+    with _UUID_LOCK:
+        if _UUID_POS >= len(_UUID_POOL):
+            raw = bytearray(os.urandom(4096))
+            raw[6::16] = bytes((b & 0x0F) | 0x40 for b in raw[6::16])  # version 4
+            raw[8::16] = bytes((b & 0x3F) | 0x80 for b in raw[8::16])  # RFC 4122 variant
+            _UUID_POOL = raw.hex()
+            _UUID_POS = 0
+        h = _UUID_POOL[_UUID_POS:_UUID_POS + 32]
+        _UUID_POS += 32
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+def _packb(obj: Any) -> bytes:
+    """msgpack-encode obj; values msgpack can't represent are written as str."""
+    if msgpack is None:
+        raise ImportError("msgpack is required for MSEntry.pack(); install it with 'pip install msgpack'")
+    return msgpack.packb(obj, default=str, use_bin_type=True)
+
+def _unpackb(buf: bytes) -> Any:
+    """Decode msgpack bytes written by _packb."""
+    if msgpack is None:
+        raise ImportError("msgpack is required for MSEntry.unpack(); install it with 'pip install msgpack'")
+    return msgpack.unpackb(buf, raw=False, strict_map_key=False)
 
 class EntryType(Enum):
     """Types of entries in MagicScroll."""
@@ -14,21 +64,50 @@ class EntryType(Enum):
     IMAGE = "image"        # For image files
     CODE = "code"         # For code snippets/files
 
-@dataclass
+# Value -> member, probed directly instead of going through Enum.__call__
+_ENTRY_TYPE_BY_VALUE: Dict[str, EntryType] = {member.value: member for member in EntryType}
+
+def entry_type_from_value(value: str) -> EntryType:
+    """Look up an EntryType by value; unknown values raise ValueError as EntryType(value) does."""
+    return _ENTRY_TYPE_BY_VALUE.get(value) or EntryType(value)
+
+@dataclass(slots=True, eq=False)
 class MSEntry:
     """Base class for MagicScroll entries."""
     content: str
     entry_type: EntryType
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_uuid_hex)
     metadata: Dict[str, Any] = field(default_factory=dict)
     created_at: datetime = field(default_factory=datetime.utcnow)
+    # (created_at, its ISO text); rebuilt if created_at is replaced
+    _iso_cache: Optional[Tuple[datetime, str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    # Entries are identified by id; comparing or hashing full content is wasted work
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MSEntry):
+            return NotImplemented
+        return self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    @property
+    def created_at_iso(self) -> str:
+        """created_at as ISO text, formatted once per created_at value."""
+        cached = self._iso_cache
+        created_at = self.created_at
+        if cached is None or cached[0] is not created_at:
+            cached = self._iso_cache = (created_at, created_at.isoformat())
+        return cached[1]
 
     def get_metadata(self) -> Dict[str, Any]:
         """Get metadata dictionary without content."""
         return {
             "id": self.id,
             "type": self.entry_type.value,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at_iso,
             **self.metadata  # spread any additional metadata
         }
 
@@ -39,35 +118,103 @@ class MSEntry:
             "id": self.id,
             "content": self.content,
             "type": self.entry_type.value,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at_iso,
             **self.metadata
         }
 
+    def _packed(self) -> List[Any]:
+        """Fields in the fixed pack() order: id, content, type, created_at, metadata."""
+        return [self.id, self.content, self.entry_type.value, self.created_at_iso, self.metadata]
+
+    @classmethod
+    def _from_packed(cls, row: List[Any]) -> 'MSEntry':
+        """Rebuild an entry from a _packed() row."""
+        entry_id, content, entry_type, created_at, metadata = row
+        return cls(
+            id=entry_id,
+            content=content,
+            entry_type=entry_type_from_value(entry_type),
+            metadata=metadata,
+            created_at=datetime.fromisoformat(created_at)
+        )
+
+    def pack(self) -> bytes:
+        """Encode the entry as a msgpack array.
+        
+        Field order is the schema, so no key strings are written or hashed.
+        """
+        return _packb(self._packed())
+
+    @classmethod
+    def unpack(cls, buf: bytes) -> 'MSEntry':
+        """Decode an entry written by pack()."""
+        return cls._from_packed(_unpackb(buf))
+
+    @staticmethod
+    def pack_many(entries: List['MSEntry']) -> bytes:
+        """Encode many entries as one msgpack array, framed once."""
+        return _packb([entry._packed() for entry in entries])
+
+    @classmethod
+    def unpack_many(cls, buf: bytes) -> List['MSEntry']:
+        """Decode entries written by pack_many()."""
+        from_packed = cls._from_packed
+        return [from_packed(row) for row in _unpackb(buf)]
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'MSEntry':
         """Create entry from dictionary format."""
+        # Copy, then pop the core fields out; what is left is the metadata.
+        # A few C-level pops beat a comprehension testing every key.
+        metadata = dict(data)
+        entry_id = metadata.pop("id")
+        content = metadata.pop("content")
+        entry_type = metadata.pop("type", "conversation")
+        
         # Convert created_at from ISO string to datetime
-        created_at = data.get("created_at")
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        else:
+        try:
+            created_at = datetime.fromisoformat(metadata.pop("created_at", None))
+        except TypeError:
             created_at = datetime.utcnow()
 
-        # Extract core fields
-        entry_type = data.get("type", "conversation")
-        
-        # Extract metadata (excluding core fields)
-        metadata = {k: v for k, v in data.items() 
-                if k not in ['id', 'content', 'type', 'created_at']}
-
         return cls(
-            id=data["id"],
-            content=data["content"],
-            entry_type=EntryType(entry_type),
+            id=entry_id,
+            content=content,
+            entry_type=entry_type_from_value(entry_type),
             metadata=metadata,
             created_at=created_at
         )
 
+    @classmethod
+    def from_dicts(cls, rows: List[Dict[str, Any]]) -> List['MSEntry']:
+        """Create entries from many to_dict-style rows in one loop.
+        
+        Same result as calling from_dict per row, with the lookups bound once.
+        """
+        entry_type_of = entry_type_from_value
+        parse = datetime.fromisoformat
+        utcnow = datetime.utcnow
+        entries = []
+        _append = entries.append
+        for row in rows:
+            metadata = dict(row)
+            pop = metadata.pop
+            entry_id = pop("id")
+            content = pop("content")
+            entry_type = pop("type", "conversation")
+            try:
+                created_at = parse(pop("created_at", None))
+            except TypeError:
+                created_at = utcnow()
+            _append(cls(
+                id=entry_id,
+                content=content,
+                entry_type=entry_type_of(entry_type),
+                metadata=metadata,
+                created_at=created_at
+            ))
+        return entries
+
     @classmethod 
     def from_neo4j(cls, node: Any) -> 'MSEntry':
         """Create entry from Neo4j node.
@@ -75,118 +222,156 @@ class MSEntry:
         Note: The node parameter is typed as Any to avoid circular imports,
         but it should be a neo4j.graph.Node.
         """
-        props = dict(node)
+        # One pass over the node's properties: the core fields are picked out
+        # and everything else goes straight into the metadata. The driver
+        # decodes new key strings for every record; interning lets all
+        # entries share one copy of each metadata key.
+        intern = sys.intern
+        entry_id = content = created_at = None
+        entry_type = 'conversation'
+        metadata = {}
+        for key, value in node.items():
+            if key == 'id':
+                entry_id = value
+            elif key == 'content':
+                content = value
+            elif key == 'type':
+                entry_type = value
+            elif key == 'created_at':
+                created_at = value
+            else:
+                metadata[intern(key)] = value
+        if entry_id is None:
+            raise KeyError('id')
+        if content is None:
+            raise KeyError('content')
         
-        # Convert Neo4j datetime to Python datetime
-        created_at = props.get('created_at')
-        if isinstance(created_at, str):
+        # The driver hands back neo4j.time.DateTime; convert it natively rather
+        # than re-parsing a string. Entries carry naive UTC datetimes.
+        if hasattr(created_at, 'to_native'):
+            created_at = created_at.to_native()
+            if created_at.tzinfo is not None:
+                created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        elif isinstance(created_at, str):
             created_at = datetime.fromisoformat(created_at)
         else:
             created_at = datetime.utcnow()
-            
-        # Get entry type, default to conversation
-        entry_type = props.get('type', 'conversation')
-
-        # Extract metadata (all props except the core ones)
-        metadata = {k: v for k, v in props.items() 
-                   if k not in ['id', 'content', 'type', 'created_at']}
 
         return cls(
-            id=props['id'],
-            content=props['content'],
-            entry_type=EntryType(entry_type),
+            id=entry_id,
+            content=content,
+            entry_type=entry_type_from_value(entry_type),
             metadata=metadata,
             created_at=created_at
         )
     
-    def to_document(self) -> Document:
+    def to_document(self) -> 'Document':
         """Convert entry to LlamaIndex Document for storage/indexing."""
+        from llama_index.core import Document
         return Document(
             text=self.content,
             doc_id=self.id,
             metadata={
                 "type": self.entry_type.value,
-                "created_at": self.created_at.isoformat(),
+                "created_at": self.created_at_iso,
                 **self.metadata
             }
         )
 
     @classmethod
-    def from_document(cls, doc: Document) -> 'MSEntry':
+    def from_document(cls, doc: 'Document') -> 'MSEntry':
         """Create entry from LlamaIndex Document.
         
         Note: This assumes the document was created from an MSEntry.
         It reconstructs the original entry type from metadata.
         """
-        metadata = doc.metadata or {}
-        entry_type = metadata.get("type", "conversation")
+        return cls.from_metadata(doc.doc_id, doc.text, doc.metadata)
+
+    @classmethod
+    def from_metadata(
+        cls,
+        entry_id: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]]
+    ) -> 'MSEntry':
+        """Create entry from content plus the metadata layout used by to_document.
         
-        # Remove the fields we store separately
-        clean_metadata = {k: v for k, v in metadata.items() 
-                         if k not in ["type", "created_at"]}
+        Lets stores rebuild entries without constructing a Document first.
+        """
+        # Copy, then remove the fields we store separately
+        clean_metadata = dict(metadata) if metadata else {}
+        entry_type = clean_metadata.pop("type", "conversation")
         
         # Parse created_at back to datetime, default to now if not found
-        created_at = metadata.get("created_at")
+        created_at = clean_metadata.pop("created_at", None)
         if created_at:
             created_at = datetime.fromisoformat(created_at)
         else:
             created_at = datetime.utcnow()
 
         return cls(
-            id=doc.doc_id,
-            content=doc.text,
-            entry_type=EntryType(entry_type),
+            id=entry_id,
+            content=content,
+            entry_type=entry_type_from_value(entry_type),
             metadata=clean_metadata,
             created_at=created_at
         )
 
 class MSConversation(MSEntry):
     """A conversation entry - fully implemented."""
+    __slots__ = ()
+
     def __init__(
         self,
         content: str,
         metadata: Optional[Dict[str, Any]] = None
     ):
+        # Copy then set, rather than unpacking into a fresh dict literal
+        merged = dict(metadata) if metadata else {}
+        merged["speaker_count"] = content.count("Assistant:") + content.count("User:")
         super().__init__(
             content=content,
             entry_type=EntryType.CONVERSATION,
-            metadata={
-                **(metadata or {}),
-                "speaker_count": content.count("Assistant:") + content.count("User:")
-            }
+            metadata=merged
         )
 
-class MSDocument(MSEntry):
+class MSDocument:
     """
     A document entry (PDF, text, etc) - NOT YET IMPLEMENTED.
     Will require appropriate LlamaIndex Reader (PDFReader, etc)
     to convert to text before storage.
     """
-    def __init__(self):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
         raise NotImplementedError(
             "Document handling not yet implemented. "
             "Will require LlamaIndex Reader setup."
         )
 
-class MSImage(MSEntry):
+class MSImage:
     """
     An image entry - NOT YET IMPLEMENTED.
     Will require ImageReader or similar to extract/generate 
     text content before storage.
     """
-    def __init__(self):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
         raise NotImplementedError(
             "Image handling not yet implemented. "
             "Will require image processing setup."
         )
 
-class MSCode(MSEntry):
+class MSCode:
     """
     A code entry - NOT YET IMPLEMENTED.
     May require special handling for language-specific parsing
     or documentation extraction.
     """
-    def __init__(self):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
         raise NotImplementedError(
             "Code handling not yet implemented. "
             "Will require code parsing setup."
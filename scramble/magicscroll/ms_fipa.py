@@ -1,11 +1,34 @@
 from typing import List, Dict, Any, Optional
 import sqlite3
 import json
+import threading
 from datetime import datetime, UTC
 import uuid
 from pathlib import Path
 
 from .ms_entry import MSConversation
+from scramble.config import Config
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+def _json_dumps(obj: Any) -> str:
+    """Encode metadata to JSON text, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+# Metadata is stored as JSON text so SQLite's json functions can read it
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Stored message columns, in table order; the generated message_type column
+# is left out so callers see the same message dicts as before it existed
+_MESSAGE_COLUMNS = (
+    "message_id, conversation_id, sender, receiver, content, "
+    "performative, timestamp, metadata"
+)
 
 class MSFIPAStorage:
     """FIPA message storage handled by MagicScroll."""
@@ -13,11 +36,23 @@ class MSFIPAStorage:
     def __init__(self, db_path: Optional[str] = None):
         """Initialize FIPA storage with optional custom path."""
         self.db_path = db_path or str(Path.home() / ".scramble" / "fipa_messages.db")
+        # One long-lived connection, shared across threads and guarded by
+        # _lock. Every write commits before returning, so no transaction stays
+        # open to block other connections to the file.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        # Wait for another process's write to commit instead of failing with
+        # "database is locked"
+        self._conn.execute(f"PRAGMA busy_timeout={int(Config.FIPA_BUSY_TIMEOUT_MS)}")
         self._initialize_db()
         
     def _initialize_db(self):
         """Set up the SQLite database tables."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
         cursor = conn.cursor()
         
         # Create conversations table
@@ -45,27 +80,40 @@ class MSFIPAStorage:
         )
         ''')
         
+        # message_type is computed from the metadata JSON so the EPHEMERAL
+        # filter can run in SQL; added here for databases created without it
+        columns = {row[1] for row in cursor.execute("PRAGMA table_xinfo(fipa_messages)")}
+        if "message_type" not in columns:
+            cursor.execute('''
+            ALTER TABLE fipa_messages ADD COLUMN message_type TEXT
+            GENERATED ALWAYS AS (json_extract(metadata, '$.message_type')) VIRTUAL
+            ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_fipa_messages_type
+        ON fipa_messages (conversation_id, message_type, timestamp)
+        ''')
+        
         conn.commit()
-        conn.close()
+    
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self._conn.close()
     
     def create_conversation(self, metadata: Optional[Dict[str, Any]] = None) -> str:
         """Create a new FIPA conversation and return its ID."""
         conversation_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO fipa_conversations VALUES (?, ?, ?, ?)",
-            (
-                conversation_id,
-                datetime.now(UTC).isoformat(),
-                None,
-                json.dumps(metadata or {})
-            )
+        row = (
+            conversation_id,
+            datetime.now(UTC).isoformat(),
+            None,
+            _json_dumps(metadata or {})
         )
         
-        conn.commit()
-        conn.close()
+        with self._lock:
+            conn = self._conn
+            conn.execute("INSERT INTO fipa_conversations VALUES (?, ?, ?, ?)", row)
+            conn.commit()
         return conversation_id
     
     def save_message(self, 
@@ -77,73 +125,103 @@ class MSFIPAStorage:
                     metadata: Optional[Dict[str, Any]] = None) -> str:
         """Save a FIPA message to the database."""
         message_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         
         metadata = metadata or {}
+        row = (
+            message_id,
+            conversation_id,
+            sender,
+            receiver,
+            content,
+            performative,
+            datetime.now(UTC).isoformat(),
+            _json_dumps(metadata)
+        )
         
-        cursor.execute(
-            "INSERT INTO fipa_messages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        with self._lock:
+            conn = self._conn
+            conn.execute("INSERT INTO fipa_messages VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+            conn.commit()
+        return message_id
+    
+    def save_messages(self, conversation_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+        """Save several FIPA messages in one transaction and return their IDs.
+        
+        Each message is a dict with sender, receiver and content, plus optional
+        performative (default "INFORM") and metadata. All rows are written
+        with one executemany and one commit. They share one timestamp, so
+        reads order them by rowid, which follows insertion order.
+        """
+        timestamp = datetime.now(UTC).isoformat()
+        dumps = _json_dumps
+        rows = [
             (
-                message_id,
+                str(uuid.uuid4()),
                 conversation_id,
-                sender,
-                receiver,
-                content,
-                performative,
-                datetime.now(UTC).isoformat(),
-                json.dumps(metadata)
+                msg["sender"],
+                msg["receiver"],
+                msg["content"],
+                msg.get("performative", "INFORM"),
+                timestamp,
+                dumps(msg.get("metadata") or {})
             )
-        )
+            for msg in messages
+        ]
         
-        conn.commit()
-        conn.close()
-        return message_id
+        # Commits on success, rolls back on error
+        with self._lock, self._conn as conn:
+            conn.executemany("INSERT INTO fipa_messages VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return [row[0] for row in rows]
     
     def get_conversation_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
         """Get all messages for a conversation."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT * FROM fipa_messages WHERE conversation_id = ? ORDER BY timestamp",
-            (conversation_id,)
-        )
-        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_MESSAGE_COLUMNS} FROM fipa_messages "
+                "WHERE conversation_id = ? ORDER BY timestamp, rowid",
+                (conversation_id,)
+            ).fetchall()
+        return self._rows_to_messages(rows)
+    
+    @staticmethod
+    def _rows_to_messages(rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        """Build message dicts from fipa_messages rows, decoding the metadata."""
+        loads = _json_loads
         messages = []
-        for row in cursor.fetchall():
+        for row in rows:
             message = dict(row)
-            message["metadata"] = json.loads(message["metadata"])
+            message["metadata"] = loads(message["metadata"])
             messages.append(message)
         
-        conn.close()
         return messages
     
     def close_conversation(self, conversation_id: str) -> bool:
         """Mark a conversation as closed."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "UPDATE fipa_conversations SET end_time = ? WHERE conversation_id = ?",
-            (datetime.now(UTC).isoformat(), conversation_id)
-        )
-        
-        success = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        with self._lock:
+            conn = self._conn
+            cursor = conn.execute(
+                "UPDATE fipa_conversations SET end_time = ? WHERE conversation_id = ?",
+                (datetime.now(UTC).isoformat(), conversation_id)
+            )
+            success = cursor.rowcount > 0
+            conn.commit()
         return success
     
     def get_filtered_conversation(self, conversation_id: str, 
                                 include_ephemeral: bool = False) -> List[Dict[str, Any]]:
-        """Get messages from a conversation, optionally filtering out ephemeral ones."""
-        messages = self.get_conversation_messages(conversation_id)
+        """Get messages from a conversation, optionally filtering out ephemeral ones.
         
-        if not include_ephemeral:
-            messages = [
-                msg for msg in messages 
-                if not msg["metadata"].get("message_type") == "EPHEMERAL"
-            ]
-            
-        return messages
+        The filter runs in SQL on the generated message_type column, so
+        ephemeral rows are never fetched or decoded.
+        """
+        if include_ephemeral:
+            return self.get_conversation_messages(conversation_id)
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_MESSAGE_COLUMNS} FROM fipa_messages "
+                "WHERE conversation_id = ? AND message_type IS NOT 'EPHEMERAL' "
+                "ORDER BY timestamp, rowid",
+                (conversation_id,)
+            ).fetchall()
+        return self._rows_to_messages(rows)
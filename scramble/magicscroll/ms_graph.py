@@ -1,10 +1,12 @@
 """Neo4j graph operations for MagicScroll."""
-from typing import Dict, List, Any, Optional, Set
-from datetime import datetime
+from typing import Dict, List, Any, Optional, Set, Final, Tuple
+from datetime import datetime, timedelta, timezone
 import asyncio
+import random
 from neo4j import AsyncGraphDatabase, AsyncDriver, Query
 from neo4j.exceptions import Neo4jError
 from scramble.utils.logging import get_logger
+from scramble.config import Config
 from .ms_entry import MSEntry
 from typing_extensions import LiteralString
 from typing import cast
@@ -15,50 +17,225 @@ def literal_query(text: str) -> Query:
     """Create a Query object from a string, casting to LiteralString."""
     return Query(cast(LiteralString, text))
 
+def _as_utc(value: datetime) -> datetime:
+    """Mark a naive UTC datetime as zoned so Bolt sends it as a DateTime.
+    
+    Saves formatting an ISO string here only for Cypher's datetime() to parse it.
+    """
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+# Cypher text is kept as module constants so every call sends byte-identical
+# query strings and hits the server-side plan cache.
+_PING_QUERY: Final[LiteralString] = "RETURN 1"
+
+_SCHEMA_QUERIES: Final[tuple[LiteralString, ...]] = (
+    "CREATE CONSTRAINT entry_id IF NOT EXISTS FOR (e:Entry) REQUIRE e.id IS UNIQUE",
+    "CREATE CONSTRAINT entity_name IF NOT EXISTS FOR (e:Entity) REQUIRE e.name IS UNIQUE",
+    "CREATE INDEX entry_timestamp IF NOT EXISTS FOR (e:Entry) ON (e.created_at)",
+    "CREATE INDEX entry_type IF NOT EXISTS FOR (e:Entry) ON (e.type)",
+)
+
+# Node, parent link and entity links for one entry in a single statement;
+# a null $parent_id or empty $entities simply skips that part
+_WRITE_ENTRY_QUERY: Final[LiteralString] = """
+CREATE (e:Entry {
+    id: $id,
+    type: $type,
+    content: $content,
+    created_at: $timestamp
+})
+WITH e
+OPTIONAL MATCH (parent:Entry {id: $parent_id})
+FOREACH (_ IN CASE WHEN parent IS NULL THEN [] ELSE [1] END |
+    CREATE (e)-[:CONTINUES]->(parent)
+)
+WITH e
+UNWIND $entities as entity_name
+MERGE (ent:Entity {name: entity_name})
+CREATE (e)-[:MENTIONS]->(ent)
+"""
+
+# Batched forms of the three writes above: one row per entry, one commit per batch
+_CREATE_ENTRIES_QUERY: Final[LiteralString] = """
+UNWIND $rows AS row
+CREATE (e:Entry {
+    id: row.id,
+    type: row.type,
+    content: row.content,
+    created_at: row.timestamp
+})
+"""
+
+_LINK_PARENTS_QUERY: Final[LiteralString] = """
+UNWIND $rows AS row
+MATCH (child:Entry {id: row.id})
+MATCH (parent:Entry {id: row.parent_id})
+CREATE (child)-[:CONTINUES]->(parent)
+"""
+
+_LINK_ALL_ENTITIES_QUERY: Final[LiteralString] = """
+UNWIND $rows AS row
+MATCH (e:Entry {id: row.id})
+UNWIND row.entities as entity_name
+MERGE (ent:Entity {name: entity_name})
+CREATE (e)-[:MENTIONS]->(ent)
+"""
+
+# Path bounds cannot be parameters; a literal cap trimmed by $max_depth keeps
+# the text constant
+_THREAD_QUERY: Final[LiteralString] = """
+MATCH path = (start:Entry {id: $entry_id})
+    -[:CONTINUES*1..20]-(related:Entry)
+WHERE length(path) <= $max_depth
+WITH nodes(path) as entries
+UNWIND entries as entry
+RETURN DISTINCT entry
+ORDER BY entry.created_at
+"""
+
+# Recent entries and the chain each one continues, in one round trip. Path
+# bounds cannot be parameters, so the literal cap is trimmed by $max_depth.
+_RECENT_THREADS_QUERY: Final[LiteralString] = """
+MATCH (e:Entry)
+WHERE ($since IS NULL OR e.created_at >= $since)
+  AND ($types IS NULL OR e.type IN $types)
+WITH e
+ORDER BY e.created_at DESC
+LIMIT $limit
+OPTIONAL MATCH path = (e)-[:CONTINUES*1..20]->(:Entry)
+WHERE length(path) <= $max_depth
+WITH e, path
+ORDER BY length(path) DESC
+WITH e, collect(path)[0] AS longest
+RETURN e AS entry,
+       CASE WHEN longest IS NULL THEN [] ELSE nodes(longest)[1..] END AS chain
+ORDER BY e.created_at DESC
+"""
+
+_RELATED_QUERY: Final[LiteralString] = """
+MATCH (e:Entry {id: $entry_id})
+
+// Find entries sharing entities
+OPTIONAL MATCH (e)-[:MENTIONS]->(ent:Entity)
+    <-[:MENTIONS]-(related:Entry)
+WHERE related.id <> e.id
+
+// Include entity path information
+RETURN related,
+       collect(DISTINCT ent.name) as shared_entities,
+       count(DISTINCT ent) as entity_overlap
+ORDER BY entity_overlap DESC
+LIMIT 10
+"""
+
 class MSGraphManager:
     """Handles Neo4j graph operations for MagicScroll."""
     
     def __init__(self, neo4j_driver: AsyncDriver):
         """Initialize with Neo4j driver."""
         self.driver = neo4j_driver
+        self._pending_rows: List[Dict[str, Any]] = []
+        self._write_batch = Config.NEO4J_WRITE_BATCH
 
-    async def init_schema(self) -> None:
-        """Initialize Neo4j schema with indexes."""
+    @classmethod
+    async def create(cls, neo4j_driver: AsyncDriver) -> 'MSGraphManager':
+        """Create a graph manager with its constraints and indexes in place."""
+        manager = cls(neo4j_driver)
+        await manager.init_schema()
+        return manager
+
+    @classmethod
+    async def connect(
+        cls,
+        uri: Optional[str] = None,
+        user: Optional[str] = None,
+        password: Optional[str] = None
+    ) -> 'MSGraphManager':
+        """Open a pooled driver from Config, set up the schema and warm the pool."""
+        neo4j_config = Config.get_neo4j_config()
+        driver = AsyncGraphDatabase.driver(
+            uri or neo4j_config["uri"],
+            auth=(user or neo4j_config["user"], password or neo4j_config["password"]),
+            **Config.get_neo4j_driver_options()
+        )
+        manager = cls(driver)
+        await manager.wait_until_ready()
+        
+        # Schema setup holds one session; warming fills the rest of the pool
+        # alongside it instead of after it
+        results = await asyncio.gather(
+            manager.init_schema(),
+            manager.warm_pool(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return manager
+
+    async def wait_until_ready(self, deadline: Optional[float] = None) -> bool:
+        """Wait for the server to accept connections, backing off between attempts.
+        
+        Returns as soon as one check succeeds. Delays double from 0.25s up to
+        4s, with jitter, and the whole wait is bounded by `deadline` seconds.
+        """
+        deadline = Config.NEO4J_READY_DEADLINE if deadline is None else deadline
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + deadline
+        attempt = 0
+        while True:
+            try:
+                await asyncio.wait_for(self.driver.verify_connectivity(), timeout=2.0)
+                return True
+            except Exception as e:
+                remaining = give_up_at - loop.time()
+                if remaining <= 0:
+                    logger.error(f"Neo4j not ready after {deadline}s: {e}")
+                    return False
+                delay = min(0.25 * (2 ** attempt) + random.random() * 0.1, 4.0, remaining)
+                logger.info(f"Waiting {delay:.2f}s for Neo4j (attempt {attempt + 1})")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def ping(self) -> bool:
+        """Check that the Neo4j server is reachable."""
         try:
             async with self.driver.session() as session:
-                # Create constraints
-                await session.run(
-                    literal_query("""
-                    CREATE CONSTRAINT entry_id IF NOT EXISTS
-                    FOR (e:Entry) REQUIRE e.id IS UNIQUE
-                    """)
-                )
-                
-                await session.run(
-                    literal_query("""
-                    CREATE CONSTRAINT entity_name IF NOT EXISTS
-                    FOR (e:Entity) REQUIRE e.name IS UNIQUE
-                    """)
-                )
-                
-                # Create indexes
-                await session.run(
-                    literal_query("""
-                    CREATE INDEX entry_timestamp IF NOT EXISTS
-                    FOR (e:Entry) ON (e.created_at)
-                    """)
-                )
-                
-                await session.run(
-                    literal_query("""
-                    CREATE INDEX entry_type IF NOT EXISTS
-                    FOR (e:Entry) ON (e.type)
-                    """)
-                )
-                
+                await session.run(_PING_QUERY)
+            return True
         except Neo4jError as e:
-            logger.error(f"Error initializing Neo4j schema: {e}")
-            raise
+            logger.error(f"Neo4j ping failed: {e}")
+            return False
+
+    async def warm_pool(self, count: Optional[int] = None) -> int:
+        """Open connections up front so the first real queries find a hot pool.
+        
+        Runs `count` concurrent pings, each on its own session, and returns
+        how many succeeded.
+        """
+        count = Config.NEO4J_POOL_WARM if count is None else count
+        count = min(count, Config.NEO4J_POOL_SIZE)  # Never ask for more than the pool holds
+        if count <= 0:
+            return 0
+        results = await asyncio.gather(*(self.ping() for _ in range(count)))
+        warmed = sum(results)
+        logger.info(f"Warmed Neo4j pool with {warmed}/{count} connections")
+        return warmed
+
+    async def init_schema(self) -> None:
+        """Initialize Neo4j schema with indexes.
+        
+        Without the Entry(id) constraint every MATCH on an entry id is a
+        label scan. Each statement is IF NOT EXISTS, and one that fails
+        (e.g. an equivalent index under another name) doesn't stop the rest.
+        """
+        async with self.driver.session() as session:
+            # Create constraints and indexes
+            for schema_query in _SCHEMA_QUERIES:
+                try:
+                    await session.run(schema_query)
+                except Neo4jError as e:
+                    logger.error(f"Error initializing Neo4j schema: {e}")
         
     async def create_entry_node(
         self,
@@ -69,124 +246,189 @@ class MSGraphManager:
         entry_id: Optional[str] = None  # Added this parameter
     ) -> bool:
         """Create a new entry node with relationships."""
+        # One statement in one managed transaction: a single round trip and commit
+        async def write(tx: Any) -> None:
+            result = await tx.run(
+                _WRITE_ENTRY_QUERY,
+                id=entry_id or entry.id,  # Use provided ID if available
+                type=entry.entry_type.value,
+                content=content,
+                timestamp=_as_utc(entry.created_at),
+                parent_id=parent_id,
+                entities=entities or []
+            )
+            await result.consume()
+        
         try:
             async with self.driver.session() as session:
-                # Create entry node
-                await session.run(
-                    literal_query("""
-                    CREATE (e:Entry {
-                        id: $id,
-                        type: $type,
-                        content: $content,
-                        created_at: datetime($timestamp)
-                    })
-                    """),
-                    id=entry_id or entry.id,  # Use provided ID if available
-                    type=entry.entry_type.value,
-                    content=content,
-                    timestamp=entry.created_at.isoformat()
-                )
-                
-                # Create parent relationship if exists
-                if parent_id:
-                    await session.run(
-                        literal_query("""
-                        MATCH (child:Entry {id: $child_id})
-                        MATCH (parent:Entry {id: $parent_id})
-                        CREATE (child)-[:CONTINUES]->(parent)
-                        """),
-                        child_id=entry_id or entry.id,  # Use consistent ID
-                        parent_id=parent_id
-                    )
-                
-                # Create entity relationships
-                if entities:
-                    await session.run(
-                        literal_query("""
-                        MATCH (e:Entry {id: $entry_id})
-                        UNWIND $entities as entity_name
-                        MERGE (ent:Entity {name: entity_name})
-                        CREATE (e)-[:MENTIONS]->(ent)
-                        """),
-                        entry_id=entry_id or entry.id,  # Use consistent ID
-                        entities=entities
-                    )
-                
-                return True
+                await session.execute_write(write)
+            return True
                 
         except Neo4jError as e:
             logger.error(f"Error creating entry node: {e}")
             return False
 
+    async def queue_entry_node(
+        self,
+        entry: MSEntry,
+        content: str,
+        parent_id: Optional[str] = None,
+        entities: Optional[List[str]] = None,
+        entry_id: Optional[str] = None
+    ) -> None:
+        """Buffer an entry node; buffered nodes are written together by flush()."""
+        self._pending_rows.append({
+            "id": entry_id or entry.id,
+            "type": entry.entry_type.value,
+            "content": content,
+            "timestamp": _as_utc(entry.created_at),
+            "parent_id": parent_id,
+            "entities": entities or []
+        })
+        if len(self._pending_rows) >= self._write_batch:
+            await self.flush()
+
+    @property
+    def pending_count(self) -> int:
+        """Number of entry nodes waiting to be written."""
+        return len(self._pending_rows)
+
+    async def flush(self) -> bool:
+        """Write all buffered entry nodes in one transaction."""
+        if not self._pending_rows:
+            return True
+        rows, self._pending_rows = self._pending_rows, []
+        if await self.create_entry_nodes(rows):
+            return True
+        # Keep the rows for the next attempt
+        self._pending_rows[:0] = rows
+        return False
+
+    async def autoflush(self, interval: Optional[float] = None) -> None:
+        """Flush buffered entry nodes every `interval` seconds until cancelled."""
+        interval = Config.NEO4J_FLUSH_INTERVAL if interval is None else interval
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        finally:
+            await self.flush()
+
+    async def create_entry_nodes(self, rows: List[Dict[str, Any]]) -> bool:
+        """Create entry nodes with their relationships using UNWIND batches."""
+        parent_rows = [row for row in rows if row.get("parent_id")]
+        entity_rows = [row for row in rows if row.get("entities")]
+        
+        async def write(tx: Any) -> None:
+            await tx.run(_CREATE_ENTRIES_QUERY, rows=rows)
+            if parent_rows:
+                await tx.run(_LINK_PARENTS_QUERY, rows=parent_rows)
+            if entity_rows:
+                await tx.run(_LINK_ALL_ENTITIES_QUERY, rows=entity_rows)
+        
+        try:
+            async with self.driver.session() as session:
+                await session.execute_write(write)
+            logger.info(f"Wrote {len(rows)} entry nodes")
+            return True
+            
+        except Neo4jError as e:
+            logger.error(f"Error creating entry nodes: {e}")
+            return False
+
     async def get_conversation_thread(
         self,
         entry_id: str,
         max_depth: int = 5
     ) -> List[MSEntry]:
         """Get the conversation thread for an entry."""
+        # Managed read transaction: routed to readers and retried on transient errors
+        async def read(tx: Any) -> List[Any]:
+            result = await tx.run(
+                _THREAD_QUERY,
+                entry_id=entry_id,
+                max_depth=max_depth
+            )
+            return [record["entry"] async for record in result]
+        
         try:
             async with self.driver.session() as session:
-                result = await session.run(
-                    literal_query("""
-                    MATCH path = (start:Entry {id: $entry_id})
-                        -[:CONTINUES*..{max_depth}]-(related:Entry)
-                    WITH nodes(path) as entries
-                    UNWIND entries as entry
-                    RETURN DISTINCT entry
-                    ORDER BY entry.created_at
-                    """),
-                    entry_id=entry_id,
-                    max_depth=max_depth
-                )
-                
-                entries = []
-                async for record in result:
-                    entry_data = record["entry"]
-                    entries.append(MSEntry.from_neo4j(entry_data))
-                
-                return entries
+                nodes = await session.execute_read(read)
+            
+            # Build entries after the transaction has closed
+            from_neo4j = MSEntry.from_neo4j
+            return [from_neo4j(node) for node in nodes]
                 
         except Neo4jError as e:
             logger.error(f"Error getting conversation thread: {e}")
             return []
 
+    async def get_recent_with_threads(
+        self,
+        hours: Optional[float] = None,
+        entry_types: Optional[List[str]] = None,
+        limit: int = 10,
+        max_depth: int = 5
+    ) -> List[Tuple[MSEntry, List[MSEntry]]]:
+        """Get recent entries, each paired with the entries it continues.
+        
+        Replaces a recent-entries query plus one thread query per entry with a
+        single statement. Chains are ordered nearest parent first.
+        """
+        # A zoned datetime goes over Bolt as-is and compares with stored DateTimes
+        since = datetime.now(timezone.utc) - timedelta(hours=hours) if hours is not None else None
+        
+        async def read(tx: Any) -> List[Any]:
+            result = await tx.run(
+                _RECENT_THREADS_QUERY,
+                since=since,
+                types=entry_types,
+                limit=limit,
+                max_depth=max_depth
+            )
+            return [record async for record in result]
+        
+        try:
+            async with self.driver.session() as session:
+                records = await session.execute_read(read)
+            
+            from_neo4j = MSEntry.from_neo4j
+            return [
+                (from_neo4j(record["entry"]), [from_neo4j(node) for node in record["chain"]])
+                for record in records
+            ]
+                
+        except Neo4jError as e:
+            logger.error(f"Error getting recent threads: {e}")
+            return []
+
     async def find_related_entries(
         self,
         entry_id: str,
         max_entity_depth: int = 2
     ) -> List[Dict[str, Any]]:
         """Find entries related through shared entities."""
+        async def read(tx: Any) -> List[Any]:
+            result = await tx.run(_RELATED_QUERY, entry_id=entry_id)
+            return [record async for record in result]
+        
         try:
             async with self.driver.session() as session:
-                result = await session.run(
-                    literal_query("""
-                    MATCH (e:Entry {id: $entry_id})
-                    
-                    // Find entries sharing entities
-                    OPTIONAL MATCH (e)-[:MENTIONS]->(ent:Entity)
-                        <-[:MENTIONS]-(related:Entry)
-                    WHERE related.id <> e.id
-                    
-                    // Include entity path information
-                    RETURN related,
-                           collect(DISTINCT ent.name) as shared_entities,
-                           count(DISTINCT ent) as entity_overlap
-                    ORDER BY entity_overlap DESC
-                    LIMIT 10
-                    """),
-                    entry_id=entry_id
-                )
-                
-                related = []
-                async for record in result:
-                    if record["related"]:
-                        related.append({
-                            'entry': MSEntry.from_neo4j(record["related"]),
-                            'shared_entities': record["shared_entities"],
-                            'overlap_score': record["entity_overlap"]
-                        })
-                
-                return related
+                records = await session.execute_read(read)
+            
+            related = []
+            _append = related.append
+            from_neo4j = MSEntry.from_neo4j
+            for record in records:
+                node = record["related"]
+                if node:
+                    _append({
+                        'entry': from_neo4j(node),
+                        'shared_entities': record["shared_entities"],
+                        'overlap_score': record["entity_overlap"]
+                    })
+            
+            return related
                 
         except Neo4jError as e:
             logger.error(f"Error finding related entries: {e}")
@@ -1,6 +1,6 @@
 """Neo4j and Redis storage implementation for MagicScroll using LlamaIndex."""
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional, cast
+from typing import List, Dict, Any, Optional, Final, TYPE_CHECKING, cast
 from neo4j import AsyncGraphDatabase, AsyncDriver, Query
 from typing_extensions import LiteralString
 
@@ -9,15 +9,18 @@ from llama_index.core import Settings, Document, StorageContext
 from llama_index.core.indices.property_graph import PropertyGraphIndex 
 from llama_index.graph_stores.neo4j import Neo4jPropertyGraphStore
 from llama_index.graph_stores.memgraph import MemgraphPropertyGraphStore
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.storage.docstore.redis import RedisDocumentStore
 from llama_index.core.indices.property_graph import DynamicLLMPathExtractor
 from llama_index.core.indices.property_graph import SimpleLLMPathExtractor
-from llama_index.llms.ollama import Ollama
 from llama_index.core.node_parser import SentenceSplitter 
 
+if TYPE_CHECKING:
+    # Annotation-only; the ollama module pulls in a heavy HTTP stack at import
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+    from llama_index.llms.ollama import Ollama
+
 # Local imports
-from scramble.config import Config
+from scramble.config import config
 from scramble.utils.logging import get_logger
 from .ms_entry import MSEntry, EntryType
 from .ms_store import MSStore
@@ -33,19 +36,31 @@ def literal_query(text: str) -> Query:
     """Create a Query object from a string, casting to LiteralString."""
     return Query(cast(LiteralString, text))
 
+# Built once at import; every call sends the same text and reuses the server's plan
+_RECENT_QUERY = literal_query("""
+MATCH (n:Entry)
+WHERE ($cutoff IS NULL OR n.created_at >= $cutoff)
+  AND ($types IS NULL OR n.type IN $types)
+RETURN n
+ORDER BY n.created_at DESC
+LIMIT $limit
+""")
+
+_PING_QUERY: Final[LiteralString] = "RETURN 1"
+
 
 class MSIndex:
     """LlamaIndex implementation for MagicScroll."""
 
     def __init__(self):
         """Initialize basic attributes."""
-        self.config = Config()
+        self.config = config  # Shared instance; Config is all class attributes
         self.doc_store: Optional[MSStore] = None
         self.graph_store: Optional[MemgraphPropertyGraphStore] = None
         self.storage_context: Optional[StorageContext] = None
         self.index: Optional[PropertyGraphIndex] = None
-        self.embed_model: Optional[HuggingFaceEmbedding] = None 
-        self.llm: Optional[Ollama] = None
+        self.embed_model: Optional['HuggingFaceEmbedding'] = None 
+        self.llm: Optional['Ollama'] = None
         
         Settings.node_parser = SentenceSplitter(
             chunk_size=1024,  # Increase from default 1024
@@ -132,7 +147,7 @@ class MSIndex:
             
             # # Test Neo4j connection
             # async with instance.neo4j_driver.session() as session:
-            #     await session.run(literal_query("RETURN 1"))
+            #     await session.run(_PING_QUERY)
             
             logger.info("Initialized Memgraph Property Graph Index with Redis document store")
             return instance
@@ -254,34 +269,18 @@ class MSIndex:
             if not self.neo4j_driver:
                 return []
 
-            query_parts = ["MATCH (n:Entry)"]
-            params: Dict[str, Any] = {}
-            
-            if hours is not None:
-                query_parts.append("WHERE n.created_at >= datetime($cutoff)")
-                cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-                params["cutoff"] = cutoff.isoformat()
-                
-                if entry_types:
-                    query_parts.append("AND n.type IN $types")
-                    params["types"] = [t.value for t in entry_types]
-            elif entry_types:
-                query_parts.append("WHERE n.type IN $types")
-                params["types"] = [t.value for t in entry_types]
-            
-            query_parts.extend([
-                "RETURN n",
-                "ORDER BY n.created_at DESC",
-                "LIMIT $limit"
-            ])
-            
-            params["limit"] = limit
+            # Unused filters are passed as null so the query text never changes
+            params: Dict[str, Any] = {
+                "cutoff": (
+                    datetime.now(timezone.utc) - timedelta(hours=hours)
+                    if hours is not None else None
+                ),
+                "types": [t.value for t in entry_types] if entry_types else None,
+                "limit": limit
+            }
             
             async with self.neo4j_driver.session() as session:
-                result = await session.run(
-                    literal_query(" ".join(query_parts)), 
-                    params
-                )
+                result = await session.run(_RECENT_QUERY, params)
                 
                 entries = []
                 async for record in result:
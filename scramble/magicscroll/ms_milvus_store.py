@@ -1,31 +1,137 @@
 """Milvus Lite vector store implementation for MagicScroll."""
-from typing import Optional, Dict, List, Any, Tuple, Union
-from datetime import datetime, timedelta
+from typing import Optional, Dict, FrozenSet, List, Any, Set, Tuple, Union
+from datetime import datetime, timedelta, timezone
+import asyncio
 import json
 import os
+import sys
 import hashlib
+import heapq
+import logging
+import math
+import threading
 import numpy as np
 
-from pymilvus import MilvusClient, DataType
+from pymilvus import MilvusClient, DataType, MilvusException
 import pymilvus
 from llama_index.core import Settings
 
-from .ms_entry import MSEntry, EntryType
+from .ms_entry import MSEntry, EntryType, entry_type_from_value
 from scramble.config import Config
 from scramble.utils.logging import get_logger
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 logger = get_logger(__name__)
 
+def _json_dumps(obj: Any) -> str:
+    """Encode to a JSON string, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+def _interned_object(pairs: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    """Build a decoded JSON object with interned keys."""
+    intern = sys.intern
+    return {intern(k): v for k, v in pairs}
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Decode a JSON string, using orjson when it is installed.
+    
+    orjson already shares key strings across documents; the stdlib fallback
+    interns them so cached entries don't each hold their own copies.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data, object_pairs_hook=_interned_object)
+
 # Default Milvus database file path from config
 DEFAULT_DB_PATH = str(Config().get_milvus_path())
 
+# One MilvusClient per database file, shared by every store instance.
+# Client construction is synchronous, so a plain thread lock guards it.
+_shared_clients: Dict[str, MilvusClient] = {}
+_shared_clients_lock = threading.Lock()
+
+# Database files whose collection and indexes have already been checked
+_ready_paths: Set[str] = set()
+
+# Database files where every row is known to carry created_ts; others keep
+# the created_at string filter for rows written before the field existed
+_created_ts_paths: Set[str] = set()
+
+# Rows per round trip when scanning or backfilling a collection
+_SCAN_BATCH = 1000
+
+# How much get_recent_entries widens its time window when it holds too few rows
+_RECENT_WINDOW_GROWTH = 8
+
+# What saving or reading an entry can raise: Milvus errors, OSError for a
+# lost connection or database file, and Key/Type/ValueError for metadata
+# that won't serialize or a row with missing or unparseable fields
+_ENTRY_ERRORS = (MilvusException, OSError, KeyError, TypeError, ValueError)
+
+class _LiteSessionTsFilter(logging.Filter):
+    """Drop query_iterator's per-call warning that Milvus Lite has no session ts.
+    
+    Lite never reports one, so the client-side timestamp it falls back to is
+    the expected path rather than a problem.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not record.getMessage().startswith("failed to get mvccTs")
+
+logging.getLogger("pymilvus.client.iterator.query_iterator").addFilter(_LiteSessionTsFilter())
+
+def _epoch_seconds(value: datetime) -> float:
+    """Epoch seconds for a datetime; naive values are UTC, as entries store them."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _naive_utc_iso(value: datetime) -> str:
+    """ISO text comparable with the stored created_at strings (naive UTC)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+def _get_shared_client(db_path: str) -> MilvusClient:
+    """Return the process-wide client for a database file, creating it on first use."""
+    with _shared_clients_lock:
+        client = _shared_clients.get(db_path)
+        if client is None:
+            client = MilvusClient(db_path)
+            _shared_clients[db_path] = client
+        return client
+
+# Metadata estimated above this many bytes is JSON-encoded in a worker thread
+JSON_OFFLOAD_THRESHOLD = 64 * 1024
+
+async def _dumps_metadata(metadata: Dict[str, Any]) -> str:
+    """Serialize metadata to JSON, keeping large payloads off the event loop."""
+    # One-level size estimate - cheap, and good enough to spot big payloads
+    approx_size = sys.getsizeof(metadata) + sum(sys.getsizeof(v) for v in metadata.values())
+    if approx_size > JSON_OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(_json_dumps, metadata)
+    return _json_dumps(metadata)
+
+def _unit_vector(embedding: Optional[List[float]]) -> Optional[List[float]]:
+    """L2-normalize an embedding so inner product equals cosine similarity."""
+    if not embedding:
+        return embedding
+    vector = np.asarray(embedding, dtype=np.float32)
+    return (vector / (np.linalg.norm(vector) + 1e-12)).tolist()
+
 class MSMilvusStore:
     """Milvus Lite storage for MagicScroll with vector search capabilities.
     
     IMPORTANT NOTES FOR MILVUS LITE:
     1. Milvus Lite only supports FLAT index type and handles indexing automatically
     2. Keep it ultra simple - just like the example in the README
-    3. No explicit index creation, no custom schema, no complex parameters
+    3. The schema mirrors the quick-setup one (int64 id, vector, dynamic fields);
+       it is only spelled out so a real Milvus server gets an HNSW index
     """
     
     def __init__(self, db_path: Optional[str] = None):
@@ -33,24 +139,45 @@ class MSMilvusStore:
         self.db_path = db_path or DEFAULT_DB_PATH
         self._ensure_directory_exists()
         
+        # Settings read on every search/hit, resolved once
+        self._hnsw_ef = Config.HNSW_EF
+        self._score_is_similarity = Config.MILVUS_METRIC_TYPE in ("COSINE", "IP")
+        
         # Initialize Milvus connection
         try:
             # Connect to Milvus Lite with file path directly
             # For PyMilvus 2.5.7, just pass the file path directly to MilvusClient
-            self.client = MilvusClient(self.db_path)
+            self.client = _get_shared_client(self.db_path)
             logger.info(f"Milvus Lite store initialized at {self.db_path}")
             
-            # Create or verify collections for storing entries
-            self._init_collections()
+            # Create or verify collections for storing entries; later stores on
+            # the same file reuse the shared client and skip the round trips
+            if self.db_path not in _ready_paths:
+                self._init_collections()
+                _ready_paths.add(self.db_path)
+            # Until created_ts is backfilled, time filters also match on created_at
+            self._legacy_ts = self.db_path not in _created_ts_paths
             
-            # Set up embedding model reference for vector operations
-            self.embed_model = Settings.embed_model
+            # Embedding model is bound on first use (see embed_model), so the store
+            # can start while the model is still loading
+            self._embed_model = None
             
         except Exception as e:
             logger.error(f"Error initializing Milvus Lite: {e}")
             self.client = None
             raise
     
+    @property
+    def embed_model(self) -> Any:
+        """Embedding model reference for vector operations."""
+        if self._embed_model is None:
+            self._embed_model = Settings.embed_model
+        return self._embed_model
+    
+    @embed_model.setter
+    def embed_model(self, model: Any) -> None:
+        self._embed_model = model
+    
     def _ensure_directory_exists(self):
         """Make sure the directory for the database exists."""
         db_dir = os.path.dirname(self.db_path)
@@ -66,26 +193,197 @@ class MSMilvusStore:
             if "conversations" not in collections:
                 logger.info("Creating 'conversations' collection")
                 
-                # Super simple collection creation - just like example
+                schema = MilvusClient.create_schema(auto_id=False, enable_dynamic_field=True)
+                schema.add_field("id", DataType.INT64, is_primary=True)
+                schema.add_field("vector", DataType.FLOAT_VECTOR, dim=384)  # vector dimension
+                schema.add_field("created_ts", DataType.INT64)  # epoch seconds for range filters
+                
                 self.client.create_collection(
                     collection_name="conversations",
-                    dimension=384  # vector dimension
+                    schema=schema,
+                    index_params=self._vector_index_params()
                 )
+                _created_ts_paths.add(self.db_path)
                 
                 logger.info("Milvus collection created successfully")
             else:
                 logger.info("Milvus collection 'conversations' already exists")
+                self._ensure_vector_index()
+                self._backfill_created_ts()
             
         except Exception as e:
             logger.error(f"Error initializing Milvus collections: {e}")
             raise
     
+    def _vector_index_params(self) -> Any:
+        """Build the vector index parameters from config."""
+        index_type = Config.MILVUS_INDEX_TYPE
+        if index_type.startswith("IVF"):
+            params: Dict[str, Any] = {"nlist": Config.MILVUS_IVF_NLIST}
+        else:
+            params = {"M": Config.HNSW_M, "efConstruction": Config.HNSW_EF_CONSTRUCTION}
+        if index_type == "HNSW_SQ":
+            # Scalar-quantized copies of the vectors make each graph probe cheaper
+            params["sq_type"] = Config.MILVUS_SQ_TYPE
+        elif index_type.endswith("_PQ"):
+            # Product quantization packs each vector into m codes of nbits each
+            params["m"] = Config.MILVUS_PQ_M
+            params["nbits"] = Config.MILVUS_PQ_NBITS
+            
+        index_params = self.client.prepare_index_params()
+        index_params.add_index(
+            field_name="vector",
+            index_type=Config.MILVUS_INDEX_TYPE,
+            metric_type=Config.MILVUS_METRIC_TYPE,
+            params=params
+        )
+        index_params.add_index(field_name="created_ts", index_type=Config.MILVUS_TS_INDEX_TYPE)
+        return index_params
+    
+    def _search_params(self, limit: int, ef_search: Optional[int] = None) -> Dict[str, Any]:
+        """Build search parameters matching the configured index type.
+        
+        `ef_search` overrides Config.HNSW_EF for one query, trading latency for recall.
+        """
+        if Config.MILVUS_INDEX_TYPE.startswith("IVF"):
+            return {"params": {"nprobe": Config.MILVUS_IVF_NPROBE}}
+        return {"params": {"ef": max(ef_search or self._hnsw_ef, limit)}}
+    
+    def _backfill_created_ts(self) -> None:
+        """Add created_ts to rows written before the field existed.
+        
+        Those rows carry only the created_at string, so time filters on
+        created_ts alone would skip them. On failure the path stays out of
+        _created_ts_paths and filters keep the created_at fallback.
+        """
+        try:
+            seen: Set[int] = set()
+            while True:
+                rows = self.client.query(
+                    collection_name="conversations",
+                    filter="created_ts is null",
+                    output_fields=["*"],
+                    limit=_SCAN_BATCH
+                )
+                if not rows:
+                    break
+                if all(row["id"] in seen for row in rows):
+                    # Upserts not visible yet; leave the fallback filter on
+                    logger.warning("created_ts backfill made no progress; keeping created_at filter")
+                    return
+                seen.update(row["id"] for row in rows)
+                for row in rows:
+                    try:
+                        created_at = datetime.fromisoformat(row["created_at"])
+                    except (KeyError, TypeError, ValueError):
+                        created_at = datetime(1970, 1, 1)  # Unknown age sorts as oldest
+                    row["created_ts"] = int(_epoch_seconds(created_at))
+                self.client.upsert(collection_name="conversations", data=rows)
+            if seen:
+                logger.info(f"Backfilled created_ts on {len(seen)} Milvus rows")
+            _created_ts_paths.add(self.db_path)
+        except MilvusException as e:
+            logger.error(f"Error backfilling created_ts: {e}")
+    
+    def _ensure_vector_index(self) -> None:
+        """Index collections created without one so searches don't brute-force scan."""
+        if self.client.list_indexes(collection_name="conversations"):
+            return
+            
+        logger.info(f"Creating {Config.MILVUS_INDEX_TYPE} index on 'conversations'")
+        self.client.release_collection(collection_name="conversations")
+        self.client.create_index(
+            collection_name="conversations",
+            index_params=self._vector_index_params()
+        )
+        self.client.load_collection(collection_name="conversations")
+    
+    def _distance_to_score(self, distance: float) -> float:
+        """Convert a Milvus distance to a similarity score (higher is better)."""
+        # COSINE and IP already report similarity; only L2 is a true distance
+        if self._score_is_similarity:
+            return float(distance)
+        return 1.0 / (1.0 + float(distance))
+    
+    @staticmethod
+    def _rows_to_entries(rows: List[Dict[str, Any]]) -> List[MSEntry]:
+        """Build entries from query rows in one loop with the lookups bound once."""
+        entry_cls = MSEntry
+        entry_type_of = entry_type_from_value
+        parse = datetime.fromisoformat
+        loads = _json_loads
+        return [
+            entry_cls(
+                id=row['orig_id'],  # Use original string ID
+                content=row['content'],
+                entry_type=entry_type_of(row['entry_type']),
+                created_at=parse(row['created_at']),
+                metadata=loads(row['metadata'])
+            )
+            for row in rows
+        ]
+    
     def _str_to_int64(self, s: str) -> int:
         """Convert string UUID to int64 for Milvus primary key."""
         # Use consistent hashing to create unique numeric ID from string
         h = int(hashlib.sha256(s.encode('utf-8')).hexdigest(), 16) % (2**63)
         return h
     
+    @staticmethod
+    def _temporal_expr(
+        temporal_filter: Optional[Dict[str, datetime]],
+        legacy_ts: bool = False
+    ) -> Optional[str]:
+        """Build a Milvus filter on created_ts from a start/end window.
+        
+        With `legacy_ts`, rows that have no created_ts are matched on their
+        created_at string instead.
+        """
+        if not temporal_filter:
+            return None
+        clauses = []
+        legacy_clauses = []
+        start = temporal_filter.get('start')
+        end = temporal_filter.get('end')
+        # Whole seconds, widened outward; hits are still checked against the exact datetimes
+        if start:
+            clauses.append(f"created_ts >= {math.floor(_epoch_seconds(start))}")
+            legacy_clauses.append(f"created_at >= {json.dumps(_naive_utc_iso(start))}")
+        if end:
+            clauses.append(f"created_ts <= {math.ceil(_epoch_seconds(end))}")
+            legacy_clauses.append(f"created_at <= {json.dumps(_naive_utc_iso(end))}")
+        if not clauses:
+            return None
+        expr = " and ".join(clauses)
+        if legacy_ts:
+            legacy_expr = " and ".join(legacy_clauses)
+            expr = f"(({expr}) or (created_ts is null and {legacy_expr}))"
+        return expr
+    
+    @staticmethod
+    def _entry_type_expr(entry_types: Optional[List[EntryType]]) -> Optional[str]:
+        """Build a Milvus filter restricting hits to the given entry types."""
+        if not entry_types:
+            return None
+        return f"entry_type in {json.dumps([t.value for t in entry_types])}"
+    
+    @classmethod
+    def _search_filter(
+        cls,
+        entry_types: Optional[List[EntryType]],
+        temporal_filter: Optional[Dict[str, datetime]],
+        legacy_ts: bool = False
+    ) -> str:
+        """Combine the entry type and time window filters for a vector search."""
+        clauses = [
+            expr for expr in (
+                cls._entry_type_expr(entry_types),
+                cls._temporal_expr(temporal_filter, legacy_ts)
+            )
+            if expr
+        ]
+        return " and ".join(clauses)
+    
     @classmethod
     async def create(cls, db_path: Optional[str] = None) -> 'MSMilvusStore':
         """Factory method to create store instance."""
@@ -95,24 +393,26 @@ class MSMilvusStore:
         self, 
         hit: Any, 
         score: float, 
-        entry_types: Optional[List[EntryType]] = None,
+        allowed_types: Optional[FrozenSet[str]] = None,
         temporal_filter: Optional[Dict[str, datetime]] = None,
         results: Optional[List[Dict[str, Any]]] = None
     ) -> List[Dict[str, Any]]:
-        """Process a hit from search results and add to results if it matches filters."""
-        if not results:
-            logger.warning("No results list provided to _process_hit")
+        """Process a hit from search results and add to results if it matches filters.
+        
+        `allowed_types` holds entry type values, built once per search by the caller.
+        """
+        if results is None:
             # Create a new list if one wasn't provided
-            logger.warning("Creating new results list")
             results = []
-        else:
-            logger.debug(f"Using existing results list with {len(results)} items")
         
         # Log hit structure for debugging
-        if hasattr(hit, '__dict__'):
-            logger.debug(f"Processing hit with structure: {type(hit)}")
-        else:
-            logger.debug(f"Processing hit with structure: {type(hit)}, keys: {hit.keys() if isinstance(hit, dict) else 'Not a dict'}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Using existing results list with %d items", len(results))
+            if hasattr(hit, '__dict__'):
+                logger.debug("Processing hit with structure: %s", type(hit))
+            else:
+                logger.debug("Processing hit with structure: %s, keys: %s", type(hit),
+                             hit.keys() if isinstance(hit, dict) else 'Not a dict')
         
         # Handle different hit structures
         entity = None
@@ -122,11 +422,11 @@ class MSMilvusStore:
             # Access attributes directly for Hit objects
             if hasattr(hit, 'entity') and hasattr(hit, 'distance'):
                 entity = hit.entity
-                logger.debug(f"Found entity in Hit object: {type(entity)}")
+                logger.debug("Found entity in Hit object: %s", type(entity))
             # Case 1: Hit has 'entity' key (direct from Milvus search as dict)
             elif isinstance(hit, dict) and 'entity' in hit:
                 entity = hit['entity']
-                logger.debug(f"Found entity in hit with keys: {entity.keys() if isinstance(entity, dict) else 'Not a dict'}")
+                logger.debug("Found entity in hit with keys: %s", entity.keys() if isinstance(entity, dict) else 'Not a dict')
             # Case 2: Hit is the entity itself
             elif isinstance(hit, dict) and 'content' in hit:
                 entity = hit
@@ -146,9 +446,9 @@ class MSMilvusStore:
                     for attr in ['orig_id', 'content', 'entry_type', 'created_at', 'metadata']:
                         if hasattr(hit, attr):
                             entity[attr] = getattr(hit, attr)
-                logger.debug(f"Extracted entity from hit attributes: {entity}")
+                logger.debug("Extracted entity from hit attributes: %s", entity)
             else:
-                logger.debug(f"Unknown hit structure, trying to process directly: {hit}")
+                logger.debug("Unknown hit structure, trying to process directly: %s", hit)
                 entity = hit
         except Exception as e:
             logger.warning(f"Error extracting entity: {e}")
@@ -160,31 +460,31 @@ class MSMilvusStore:
             logger.warning("No entity found in hit")
             return results
         
-        # Extract entity data, handling both dict and object-like structures
-        def get_value(obj, key, default=None):
-            if isinstance(obj, dict):
-                return obj.get(key, default)
-            elif hasattr(obj, key):
-                return getattr(obj, key, default)
-            return default
+        # Extract entity data, handling both dict and object-like structures.
+        # The accessor is chosen once per hit rather than type-checked per field.
+        if isinstance(entity, dict):
+            get_value = entity.get
+        else:
+            def get_value(key, default=None):
+                return getattr(entity, key, default)
         
         # Apply entry type filtering
-        if entry_types:
-            entry_type_value = get_value(entity, 'entry_type')
+        if allowed_types:
+            entry_type_value = get_value('entry_type')
             if not entry_type_value:  # Skip if no entry type
-                logger.debug(f"Skipping hit - no entry_type found")
+                logger.debug("Skipping hit - no entry_type found")
                 return results
                 
-            valid_types = [t.value for t in entry_types]
-            if entry_type_value not in valid_types:
-                logger.debug(f"Skipping hit - entry_type {entry_type_value} not in {valid_types}")
+            if entry_type_value not in allowed_types:
+                logger.debug("Skipping hit - entry_type %s not in %s", entry_type_value, allowed_types)
                 return results
                 
         # Apply temporal filtering
+        created_at = None
         if temporal_filter:
-            created_at_str = get_value(entity, 'created_at')
+            created_at_str = get_value('created_at')
             if not created_at_str:  # Skip if no timestamp
-                logger.debug(f"Skipping hit - no created_at timestamp")
+                logger.debug("Skipping hit - no created_at timestamp")
                 return results
                 
             try:
@@ -193,19 +493,19 @@ class MSMilvusStore:
                 end = temporal_filter.get('end')
                 
                 if start and created_at < start:
-                    logger.debug(f"Skipping hit - created_at {created_at} before start {start}")
+                    logger.debug("Skipping hit - created_at %s before start %s", created_at, start)
                     return results
                 if end and created_at > end:
-                    logger.debug(f"Skipping hit - created_at {created_at} after end {end}")
+                    logger.debug("Skipping hit - created_at %s after end %s", created_at, end)
                     return results
             except ValueError:
                 logger.warning(f"Invalid timestamp format in search result: {created_at_str}")
                 return results
         
         # Get metadata
-        metadata_str = get_value(entity, 'metadata', '{}')
+        metadata_str = get_value('metadata', '{}')
         try:
-            metadata = json.loads(metadata_str) if isinstance(metadata_str, str) else metadata_str
+            metadata = _json_loads(metadata_str) if isinstance(metadata_str, str) else metadata_str
         except json.JSONDecodeError:
             logger.warning(f"Invalid JSON in metadata: {metadata_str}")
             metadata = {}
@@ -213,21 +513,27 @@ class MSMilvusStore:
         # Extract fields with safe defaults
         try:
             # Get ID from either orig_id or id
-            entity_id = get_value(entity, 'orig_id', str(get_value(entity, 'id', '')))
+            entity_id = get_value('orig_id')
+            if entity_id is None:
+                entity_id = str(get_value('id', ''))
             
             # Get content
-            content = get_value(entity, 'content', '')
+            content = get_value('content', '')
             
             # Get entry type
-            entry_type = get_value(entity, 'entry_type', '')
+            entry_type = get_value('entry_type', '')
             
-            # Get created_at
-            created_at_str = get_value(entity, 'created_at', datetime.now().isoformat())
-            try:
-                created_at = datetime.fromisoformat(created_at_str)
-            except ValueError:
-                logger.warning(f"Invalid datetime format: {created_at_str}, using current time")
-                created_at = datetime.now()
+            # Get created_at, unless the temporal filter already parsed it
+            if created_at is None:
+                created_at_str = get_value('created_at')
+                if created_at_str is None:
+                    created_at = datetime.now()
+                else:
+                    try:
+                        created_at = datetime.fromisoformat(created_at_str)
+                    except ValueError:
+                        logger.warning(f"Invalid datetime format: {created_at_str}, using current time")
+                        created_at = datetime.now()
             
             # Create result
             result = {
@@ -241,12 +547,11 @@ class MSMilvusStore:
             
             # Add to results
             results.append(result)
-            logger.debug(f"Added hit to results with score {score}, results now has {len(results)} items")
-            # Log just ID and score in success message instead of full content
-            logger.info(f"SUCCESSFULLY PROCESSED SEARCH RESULT: {entity_id} (score: {score:.2f})")
-            # Log a brief preview of content (first 50 characters)
-            content_preview = content[:50] + '...' if len(content) > 50 else content
-            logger.info(f"CONTENT PREVIEW: {content_preview}")
+            if logger.isEnabledFor(logging.DEBUG):
+                # Log just ID, score and a brief preview instead of full content
+                logger.debug("Processed search result %s (score: %.2f), results now has %d items",
+                             entity_id, score, len(results))
+                logger.debug("Content preview: %s", content[:50] + '...' if len(content) > 50 else content)
         except Exception as e:
             logger.warning(f"Error processing hit: {e}")
             import traceback
@@ -275,19 +580,8 @@ class MSMilvusStore:
                 logger.warning("No embedding model available - entry will be stored without vector")
                 embedding = None
             
-            # Simple ID conversion
-            int_id = int(hashlib.sha256(entry.id.encode('utf-8')).hexdigest(), 16) % (2**63)
-            
             # Create simplified document structure - EXACTLY like the example
-            data = [{
-                "id": int_id,
-                "vector": embedding,
-                "orig_id": entry.id,
-                "content": entry.content,
-                "entry_type": entry.entry_type.value,
-                "created_at": entry.created_at.isoformat(),
-                "metadata": json.dumps(entry.metadata)
-            }]
+            data = [self._entry_row(entry, embedding, await _dumps_metadata(entry.metadata))]
             
             # Simple insert without any frills
             result = self.client.insert(
@@ -305,10 +599,100 @@ class MSMilvusStore:
                 logger.warning(f"Entry {entry.id} insert returned unexpected result: {result}")
                 return False
                 
-        except Exception as e:
+        except _ENTRY_ERRORS as e:
             logger.error(f"Error saving entry: {e}")
             return False
     
+    async def save_ms_entries(self, entries: List[MSEntry]) -> bool:
+        """Store several entries, overlapping embedding of one batch with insertion of the last."""
+        if not entries:
+            return True
+            
+        try:
+            if not self.client:
+                logger.warning("Cannot save entries - Milvus client not initialized")
+                return False
+            
+            logger.info(f"Saving batch of {len(entries)} entries")
+            if not self.embed_model:
+                logger.warning("No embedding model available - entries will be stored without vectors")
+            
+            batch_size = Config.EMBED_PIPELINE_BATCH
+            batches = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+            queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+            inserted = 0
+            
+            async def produce() -> None:
+                for batch in batches:
+                    embeddings: List[Optional[List[float]]] = [None] * len(batch)
+                    if self.embed_model:
+                        try:
+                            # Run in a worker thread so the insert below keeps making progress
+                            embeddings = await asyncio.to_thread(
+                                self.embed_model.get_text_embedding_batch,
+                                [entry.content for entry in batch]
+                            )
+                        except Exception as e:
+                            logger.error(f"Error generating batch embeddings: {e}")
+                    rows = [
+                        self._entry_row(entry, embedding, await _dumps_metadata(entry.metadata))
+                        for entry, embedding in zip(batch, embeddings)
+                    ]
+                    await queue.put(rows)
+                await queue.put(None)
+            
+            async def consume() -> None:
+                nonlocal inserted
+                while (rows := await queue.get()) is not None:
+                    result = await asyncio.to_thread(
+                        self.client.insert,
+                        collection_name="conversations",
+                        data=rows
+                    )
+                    inserted += result.get('insert_count', 0) if result else 0
+            
+            # If either side fails the task group cancels the other, so a
+            # producer blocked on a full queue never outlives a dead consumer
+            try:
+                async with asyncio.TaskGroup() as group:
+                    group.create_task(produce())
+                    group.create_task(consume())
+            except ExceptionGroup as group_error:
+                raise group_error.exceptions[0]
+            
+            if inserted == len(entries):
+                logger.info(f"Batch of {len(entries)} entries stored successfully")
+                return True
+            else:
+                logger.warning(f"Batch insert stored {inserted} of {len(entries)} entries")
+                return False
+                
+        except Exception as e:
+            logger.error(f"Error saving entry batch: {e}")
+            return False
+    
+    def _entry_row(
+        self,
+        entry: MSEntry,
+        embedding: Optional[List[float]],
+        metadata_json: str
+    ) -> Dict[str, Any]:
+        """Build the Milvus row for an entry.
+        
+        Reads the entry's fields directly rather than going through to_dict(),
+        so no intermediate dict is built per row.
+        """
+        return {
+            "id": self._str_to_int64(entry.id),
+            "vector": _unit_vector(embedding),
+            "orig_id": entry.id,
+            "content": entry.content,
+            "entry_type": entry.entry_type.value,
+            "created_at": entry.created_at_iso,
+            "created_ts": int(_epoch_seconds(entry.created_at)),
+            "metadata": metadata_json
+        }
+    
     async def get_ms_entry(self, entry_id: str) -> Optional[MSEntry]:
         """Retrieve a MagicScroll entry by ID."""
         try:
@@ -334,7 +718,7 @@ class MSMilvusStore:
                 
             # Parse the row data
             row = results[0]
-            metadata = json.loads(row['metadata'])
+            metadata = _json_loads(row['metadata'])
             
             # Use original string ID, not the int64 ID
             entry_id = row['orig_id']
@@ -351,10 +735,35 @@ class MSMilvusStore:
             logger.info(f"Successfully retrieved entry {entry_id}")
             return entry
             
-        except Exception as e:
+        except _ENTRY_ERRORS as e:
             logger.error(f"Error retrieving entry: {e}")
             return None
     
+    async def get_ms_entries(self, entry_ids: List[str]) -> List[Optional[MSEntry]]:
+        """Retrieve several entries with one query, in the order requested."""
+        if not entry_ids:
+            return []
+            
+        try:
+            if not self.client:
+                logger.warning("Cannot retrieve entries - Milvus client not initialized")
+                return [None] * len(entry_ids)
+                
+            int_ids = [self._str_to_int64(entry_id) for entry_id in entry_ids]
+            rows = self.client.query(
+                collection_name="conversations",
+                filter=f"id in {int_ids}",
+                output_fields=["id", "orig_id", "content", "entry_type", "created_at", "metadata"]
+            )
+            
+            by_id = {entry.id: entry for entry in self._rows_to_entries(rows)}
+            logger.info(f"Retrieved {len(by_id)} of {len(entry_ids)} entries")
+            return [by_id.get(entry_id) for entry_id in entry_ids]
+            
+        except _ENTRY_ERRORS as e:
+            logger.error(f"Error retrieving entries: {e}")
+            return [None] * len(entry_ids)
+    
     async def delete_ms_entry(self, entry_id: str) -> bool:
         """Delete a MagicScroll entry by ID."""
         try:
@@ -389,52 +798,56 @@ class MSMilvusStore:
         query_embedding: List[float], 
         limit: int = 5,
         entry_types: Optional[List[EntryType]] = None,
-        temporal_filter: Optional[Dict[str, datetime]] = None
+        temporal_filter: Optional[Dict[str, datetime]] = None,
+        ef_search: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """Search entries by vector similarity with ultra-simple implementation."""
-        logger.info(f"Performing vector search with {len(query_embedding)}-dimensional vector")
-        logger.info(f"Search limit: {limit}")
+        logger.debug("Performing vector search with %d-dimensional vector, limit=%d",
+                     len(query_embedding), limit)
         if entry_types:
-            logger.info(f"Filtering by entry types: {[t.value for t in entry_types]}")
+            logger.debug("Filtering by entry types: %s", entry_types)
         if temporal_filter:
-            logger.info(f"Temporal filter: {temporal_filter}")
+            logger.debug("Temporal filter: %s", temporal_filter)
             
         if not self.client:
             logger.warning("Cannot search - Milvus client not initialized")
             return []
             
-        try:
-            logger.info(f"Searching with vector, limit={limit}")
+        # Entry type values checked against every hit, resolved once
+        allowed_types = frozenset(t.value for t in entry_types) if entry_types else None
             
+        try:
             # Ultra-simple search just like example
             search_results = self.client.search(
                 collection_name="conversations",
-                data=[query_embedding],
+                data=[_unit_vector(query_embedding)],
                 limit=limit,
-                output_fields=["id", "orig_id", "content", "entry_type", "created_at", "metadata"]
+                output_fields=["id", "orig_id", "content", "entry_type", "created_at", "metadata"],
+                # Filter inside the ANN search so `limit` counts matching hits only
+                filter=self._search_filter(entry_types, temporal_filter, self._legacy_ts),
+                search_params=self._search_params(limit, ef_search)
             )
             
-            # Debug print the structure
-            logger.info(f"Search results type: {type(search_results)}")
-            
-            # Log results in a more concise format
-            if isinstance(search_results, list) and search_results:
-                logger.info(f"Found {len(search_results)} result lists")
-                for i, hit_list in enumerate(search_results):
-                    if isinstance(hit_list, list):
-                        logger.info(f"Result list {i}: {len(hit_list)} hits")
-                        # Log just basic info for each hit, not the entire content
-                        for j, hit in enumerate(hit_list[:3]):  # Limit to first 3 for brevity
-                            if hasattr(hit, 'id') and hasattr(hit, 'distance'):
-                                logger.info(f"  Hit {j}: ID={hit.id}, distance={hit.distance:.4f}")
-                            elif isinstance(hit, dict) and 'id' in hit and 'distance' in hit:
-                                logger.info(f"  Hit {j}: ID={hit['id']}, distance={hit['distance']:.4f}")
-            elif isinstance(search_results, dict):
-                logger.info(f"Search results is a dict with keys: {search_results.keys()}")
-                if 'results' in search_results and isinstance(search_results['results'], list):
-                    logger.info(f"Found {len(search_results['results'])} hits in results key")
-            else:
-                logger.info("Unknown search results structure")
+            # Describing the raw result structure is only useful when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Search results type: {type(search_results)}")
+                if isinstance(search_results, list) and search_results:
+                    logger.debug(f"Found {len(search_results)} result lists")
+                    for i, hit_list in enumerate(search_results):
+                        if isinstance(hit_list, list):
+                            logger.debug(f"Result list {i}: {len(hit_list)} hits")
+                            # Log just basic info for each hit, not the entire content
+                            for j, hit in enumerate(hit_list[:3]):  # Limit to first 3 for brevity
+                                if hasattr(hit, 'id') and hasattr(hit, 'distance'):
+                                    logger.debug(f"  Hit {j}: ID={hit.id}, distance={hit.distance:.4f}")
+                                elif isinstance(hit, dict) and 'id' in hit and 'distance' in hit:
+                                    logger.debug(f"  Hit {j}: ID={hit['id']}, distance={hit['distance']:.4f}")
+                elif isinstance(search_results, dict):
+                    logger.debug(f"Search results is a dict with keys: {search_results.keys()}")
+                    if 'results' in search_results and isinstance(search_results['results'], list):
+                        logger.debug(f"Found {len(search_results['results'])} hits in results key")
+                else:
+                    logger.debug("Unknown search results structure")
             
             if not search_results:
                 logger.info("Vector search returned no results (empty)")
@@ -459,57 +872,56 @@ class MSMilvusStore:
                         if isinstance(hits, list):
                             for hit in hits:
                                 # Don't log the entire hit structure - too verbose
-                                logger.info(f"Processing hit: ID {hit.get('id', 'unknown')}, distance: {hit.get('distance', 'N/A')}")
+                                logger.debug("Processing hit: ID %s, distance: %s", hit.get('id', 'unknown'), hit.get('distance', 'N/A'))
                                 
-                                # Convert distance to score (closer distance = higher score)
-                                # Milvus distances are in range [0,2], convert to [0,1] similarity scores
+                                # Convert distance to score (higher score = more similar)
                                 distance = hit.get('distance', 0)
-                                score = 1.0 - (distance / 2.0)  # Convert distance to similarity score
+                                score = self._distance_to_score(distance)
                                 
                                 # Process the hit and update results
-                                updated_results = self._process_hit(hit, score, entry_types, temporal_filter, results)
+                                updated_results = self._process_hit(hit, score, allowed_types, temporal_filter, results)
                                 if updated_results:
                                     results = updated_results
                                     
-                                logger.info(f"Processed hit with score {score}, results now has {len(results)} items")
+                                logger.debug("Processed hit with score %s, results now has %d items", score, len(results))
                 # Approach 2: Direct list of results
                 elif isinstance(search_results, list):
                     for hit in search_results:
                         if isinstance(hit, dict):
-                            logger.info(f"Processing direct hit: {hit}")
+                            logger.debug("Processing direct hit: %s", hit)
                             # Get score or convert from distance
                             if 'distance' in hit:
                                 distance = hit.get('distance', 0)
-                                score = 1.0 - (distance / 2.0)
+                                score = self._distance_to_score(distance)
                             else:
                                 score = hit.get('score', 0.5)
                                 
                             # Process the hit and update results
-                            updated_results = self._process_hit(hit, score, entry_types, temporal_filter, results)
+                            updated_results = self._process_hit(hit, score, allowed_types, temporal_filter, results)
                             if updated_results:
                                 results = updated_results
                                 
-                            logger.info(f"Processed direct hit with score {score}, results now has {len(results)} items")
+                            logger.debug("Processed direct hit with score %s, results now has %d items", score, len(results))
                 # Approach 3: Dictionary structure
                 elif isinstance(search_results, dict):
                     if 'results' in search_results:
                         hits = search_results['results']
                         for hit in hits:
                             if isinstance(hit, dict):
-                                logger.info(f"Processing dict hit: {hit}")
+                                logger.debug("Processing dict hit: %s", hit)
                                 # Get score or convert from distance
                                 if 'distance' in hit:
                                     distance = hit.get('distance', 0)
-                                    score = 1.0 - (distance / 2.0)
+                                    score = self._distance_to_score(distance)
                                 else:
                                     score = hit.get('score', 0.5)
                                 
                                 # Process the hit and update results
-                                updated_results = self._process_hit(hit, score, entry_types, temporal_filter, results)
+                                updated_results = self._process_hit(hit, score, allowed_types, temporal_filter, results)
                                 if updated_results:
                                     results = updated_results
                                     
-                                logger.info(f"Processed dict hit with score {score}, results now has {len(results)} items")
+                                logger.debug("Processed dict hit with score %s, results now has %d items", score, len(results))
             except Exception as parse_err:
                 logger.error(f"Error parsing search results: {parse_err}")
                 
@@ -557,11 +969,8 @@ class MSMilvusStore:
                         
                         # Process query results
                         for item in fallback_results:
-                            if entry_types:
-                                entry_type_value = item.get('entry_type')
-                                valid_types = [t.value for t in entry_types]
-                                if entry_type_value not in valid_types:
-                                    continue
+                            if allowed_types and item.get('entry_type') not in allowed_types:
+                                continue
                                     
                             if temporal_filter:
                                 created_at = datetime.fromisoformat(item.get('created_at', ''))
@@ -579,22 +988,18 @@ class MSMilvusStore:
                                 "content": item.get('content', ''),
                                 "entry_type": item.get('entry_type', ''),
                                 "created_at": datetime.fromisoformat(item.get('created_at', datetime.now().isoformat())),
-                                "metadata": json.loads(item.get('metadata', '{}'))
+                                "metadata": _json_loads(item.get('metadata', '{}'))
                             })
                     except Exception as query_err:
                         logger.error(f"Fallback query failed: {query_err}")
             
-            logger.info("===========================================================")
-            logger.info(f"VECTOR SEARCH COMPLETE: FOUND {len(results)} RESULTS")
-            if len(results) > 0:
-                logger.info("RESULTS SUMMARY:")
-                # List all the result IDs and scores
-                for i, result in enumerate(results[:3]):  # Show first 3 results
-                    logger.info(f"  RESULT {i+1}: {result.get('id', 'N/A')} (score: {result.get('score', 0):.2f})")
-                    content_preview = result.get('content', '')[:100] + '...' if len(result.get('content', '')) > 100 else result.get('content', '')
-                    logger.info(f"  PREVIEW: {content_preview}")
-            logger.info("SENDING RESULTS TO MESSAGE ENRICHER FOR CONTEXT BUILDING")
-            logger.info("===========================================================")
+            logger.debug("Vector search complete: found %d results", len(results))
+            if logger.isEnabledFor(logging.DEBUG):
+                # List the first few result IDs and scores
+                for i, result in enumerate(results[:3]):
+                    content = result.get('content', '')
+                    logger.debug("  Result %d: %s (score: %.2f)", i + 1, result.get('id', 'N/A'), result.get('score', 0))
+                    logger.debug("  Preview: %s", content[:100] + '...' if len(content) > 100 else content)
             
             return results
             
@@ -602,13 +1007,108 @@ class MSMilvusStore:
             logger.error(f"Error in vector search: {e}")
             return []
     
+    async def search_unfiltered(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        ef_search: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Vector search with no entry type or time filter, mapping hits directly to rows."""
+        results = await self.search_unfiltered_many([query_embedding], limit=limit, ef_search=ef_search)
+        return results[0]
+    
+    async def search_unfiltered_many(
+        self,
+        query_embeddings: List[List[float]],
+        limit: int = 5,
+        ef_search: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Run several unfiltered vector searches in one Milvus call.
+        
+        Returns one list of rows per query embedding, in the same order.
+        """
+        if not self.client:
+            logger.warning("Cannot search - Milvus client not initialized")
+            return [[] for _ in query_embeddings]
+            
+        try:
+            search_results = self.client.search(
+                collection_name="conversations",
+                data=[_unit_vector(embedding) for embedding in query_embeddings],
+                limit=limit,
+                output_fields=["orig_id", "content", "entry_type", "created_at", "metadata"],
+                search_params=self._search_params(limit, ef_search)
+            )
+        except Exception as e:
+            logger.error(f"Error in unfiltered vector search: {e}")
+            return [[] for _ in query_embeddings]
+            
+        all_results = []
+        for hits in search_results or [[] for _ in query_embeddings]:
+            results = []
+            for hit in hits:
+                entity = hit['entity']
+                metadata = entity.get('metadata') or '{}'
+                results.append({
+                    "id": entity.get('orig_id') or str(hit['id']),
+                    "score": self._distance_to_score(hit['distance']),
+                    "content": entity.get('content', ''),
+                    "entry_type": entity.get('entry_type', ''),
+                    "created_at": datetime.fromisoformat(entity['created_at']),
+                    "metadata": _json_loads(metadata) if isinstance(metadata, str) else metadata
+                })
+            all_results.append(results)
+        return all_results
+    
+    async def count_by_type(self, hours: Optional[int] = None) -> Dict[str, int]:
+        """Count entries per entry type, optionally only those from the last `hours`.
+        
+        Runs a count(*) per type in Milvus instead of loading entries to count them.
+        """
+        if not self.client:
+            logger.warning("Cannot count entries - Milvus client not initialized")
+            return {}
+            
+        try:
+            time_expr = (
+                self._temporal_expr(
+                    {'start': datetime.now(timezone.utc) - timedelta(hours=hours)},
+                    self._legacy_ts
+                )
+                if hours is not None else None
+            )
+            counts: Dict[str, int] = {}
+            for entry_type in EntryType:
+                expr = f'entry_type == "{entry_type.value}"'
+                if time_expr:
+                    expr = f"{expr} and {time_expr}"
+                rows = self.client.query(
+                    collection_name="conversations",
+                    filter=expr,
+                    output_fields=["count(*)"]
+                )
+                count = rows[0]["count(*)"] if rows else 0
+                if count:
+                    counts[entry_type.value] = count
+            return counts
+            
+        except MilvusException as e:
+            logger.error(f"Error counting entries: {e}")
+            return {}
+    
     async def get_recent_entries(
         self, 
         hours: Optional[int] = None,
         entry_types: Optional[List[EntryType]] = None,
         limit: int = 10
     ) -> List[MSEntry]:
-        """Get recent entries from the store."""
+        """Get the newest entries from the store, newest first.
+        
+        Milvus queries can't sort, so the matching rows are scanned with only
+        their id and created_at, a bounded heap keeps the newest `limit`, and
+        just those rows are fetched in full. The scan covers the shortest
+        recent window that holds `limit` rows, found with count(*) queries.
+        """
         if not self.client:
             logger.warning("Cannot get recent entries - Milvus client not initialized")
             return []
@@ -616,51 +1116,29 @@ class MSMilvusStore:
         try:
             logger.info(f"Getting recent entries, limit={limit}")
             
-            # Build filter expression
-            filter_parts = []
-            
-            # Add entry type filter if specified
-            if entry_types:
-                entry_type_values = [t.value for t in entry_types]
-                if len(entry_type_values) == 1:
-                    filter_parts.append(f'entry_type == "{entry_type_values[0]}"')
-                else:
-                    type_filters = [f'entry_type == "{t}"' for t in entry_type_values]
-                    filter_parts.append(f"({' || '.join(type_filters)})")
-            
-            # Add time filter if specified
-            if hours is not None:
-                cutoff_time = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
-                filter_parts.append(f'created_at >= "{cutoff_time}"')
-            
-            # Combine all filter parts
-            expr = " && ".join(filter_parts) if filter_parts else ""
+            expr = self._recent_window(hours, entry_types, limit)
             
-            # Query recent entries
-            results = self.client.query(
-                collection_name="conversations",
-                filter=expr if expr else None,
-                output_fields=["id", "orig_id", "content", "entry_type", "created_at", "metadata"],
-                limit=limit
+            # ISO timestamps sort lexicographically, and every row has created_at
+            newest_keys = heapq.nlargest(
+                limit,
+                self._iter_rows(expr, ["id", "created_at"]),
+                key=lambda r: r['created_at']
             )
-            
-            if not results:
+            if not newest_keys:
                 logger.info("No recent entries found")
                 return []
             
+            ids = [row['id'] for row in newest_keys]
+            rows = self.client.query(
+                collection_name="conversations",
+                filter=f"id in {ids}",
+                output_fields=["id", "orig_id", "content", "entry_type", "created_at", "metadata"]
+            )
+            by_id = {row['id']: row for row in rows}
+            newest_rows = [by_id[i] for i in ids if i in by_id]
+            
             # Convert to MSEntry objects
-            entries = []
-            for row in results:
-                metadata = json.loads(row['metadata'])
-                
-                entry = MSEntry(
-                    id=row['orig_id'],  # Use original string ID
-                    content=row['content'],
-                    entry_type=EntryType(row['entry_type']),
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    metadata=metadata
-                )
-                entries.append(entry)
+            entries = self._rows_to_entries(newest_rows)
             
             logger.info(f"Retrieved {len(entries)} recent entries")
             return entries
@@ -669,11 +1147,77 @@ class MSMilvusStore:
             logger.error(f"Error getting recent entries: {e}")
             return []
     
+    def _recent_window(
+        self,
+        hours: Optional[int],
+        entry_types: Optional[List[EntryType]],
+        limit: int
+    ) -> str:
+        """Return a filter for the shortest window back from now holding `limit` rows.
+        
+        Starts at MILVUS_RECENT_WINDOW_HOURS and widens until the window has
+        enough rows, reaches `hours`, or holds every matching row.
+        """
+        now = datetime.now(timezone.utc)
+        window = Config.MILVUS_RECENT_WINDOW_HOURS
+        total = None
+        while True:
+            if hours is not None and window >= hours:
+                window = hours
+            expr = self._search_filter(
+                entry_types, {'start': now - timedelta(hours=window)}, self._legacy_ts
+            )
+            if window == hours:
+                return expr
+            count = self._count(expr)
+            if count >= limit:
+                return expr
+            if total is None:
+                total = self._count(self._search_filter(entry_types, None))
+            if count >= total:
+                return expr
+            window *= _RECENT_WINDOW_GROWTH
+    
+    def _count(self, expr: str) -> int:
+        """Count the rows matching expr."""
+        rows = self.client.query(
+            collection_name="conversations",
+            filter=expr,
+            output_fields=["count(*)"]
+        )
+        return rows[0]["count(*)"] if rows else 0
+    
+    def _iter_rows(self, expr: str, output_fields: List[str]) -> Any:
+        """Yield every row matching expr, a batch per round trip."""
+        iterator = self.client.query_iterator(
+            collection_name="conversations",
+            batch_size=_SCAN_BATCH,
+            filter=expr,
+            output_fields=output_fields
+        )
+        try:
+            while batch := iterator.next():
+                yield from batch
+        finally:
+            iterator.close()
+    
     async def close(self):
-        """Close the Milvus connection."""
-        # Milvus Lite doesn't have an explicit close method
+        """Release this store; the shared client stays open for other instances."""
         logger.info("Milvus Lite connection resources released")
 
+    @classmethod
+    def close_shared_clients(cls) -> None:
+        """Close every shared Milvus client - call once at process exit."""
+        with _shared_clients_lock:
+            for db_path, client in _shared_clients.items():
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.warning(f"Error closing Milvus client for {db_path}: {e}")
+            _shared_clients.clear()
+            _ready_paths.clear()
+            _created_ts_paths.clear()
+
     def __del__(self):
         """Cleanup when the object is deleted."""
         # Milvus Lite will handle cleanup automatically
@@ -1,11 +1,13 @@
 """Search functionality for MagicScroll using Milvus vector search."""
-from typing import Dict, List, Any, Optional, TYPE_CHECKING
+from typing import Dict, List, Any, Optional, Hashable, TYPE_CHECKING
 from datetime import datetime, timezone
 import logging
 import json
+import time
+import numpy as np
 from llama_index.core import Settings
 
-from .ms_entry import MSEntry, EntryType
+from .ms_entry import MSEntry, EntryType, entry_type_from_value
 from .ms_types import SearchResult
 from scramble.utils.logging import get_logger
 
@@ -14,6 +16,74 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+class SemanticSearchCache:
+    """Caches search results keyed by query embedding.
+    
+    A lookup hits when a cached query with the same search parameters has
+    cosine similarity of at least `threshold` and is younger than `ttl` seconds.
+    """
+    
+    def __init__(self, threshold: float = 0.95, ttl: float = 300.0, max_size: int = 512):
+        """Initialize an empty cache."""
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._vectors: Optional[np.ndarray] = None  # (n, dim) unit vectors
+        self._params: List[Hashable] = []
+        self._results: List[List[SearchResult]] = []
+        self._stored_at: List[float] = []
+        self._last_used: List[float] = []
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        """Return the embedding as an L2-normalized float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, embedding: List[float], params: Hashable) -> Optional[List[SearchResult]]:
+        """Return cached results for a similar enough query, if any."""
+        if self._vectors is None:
+            return None
+            
+        now = time.monotonic()
+        scores = self._vectors @ self._unit(embedding)
+        candidates = np.flatnonzero(scores >= self.threshold)
+        
+        # Best match first; skip entries with other parameters or past their TTL
+        for i in candidates[np.argsort(scores[candidates])[::-1]]:
+            if self._params[i] == params and now - self._stored_at[i] <= self.ttl:
+                self._last_used[i] = now
+                return list(self._results[i])
+        return None
+
+    def put(self, embedding: List[float], params: Hashable, results: List[SearchResult]) -> None:
+        """Cache results for a query, evicting the least recently used entry when full."""
+        now = time.monotonic()
+        vector = self._unit(embedding)
+        
+        if self._vectors is None:
+            self._vectors = vector[np.newaxis, :]
+        elif len(self._results) < self.max_size:
+            self._vectors = np.vstack([self._vectors, vector])
+        else:
+            i = int(np.argmin(self._last_used))
+            self._vectors[i] = vector
+            self._params[i] = params
+            self._results[i] = list(results)
+            self._stored_at[i] = now
+            self._last_used[i] = now
+            return
+            
+        self._params.append(params)
+        self._results.append(list(results))
+        self._stored_at.append(now)
+        self._last_used.append(now)
+
 class MSSearch:
     """Handles search operations with Milvus vector search."""
     
@@ -34,7 +104,7 @@ class MSSearch:
         
         logger.info("MSSearch initialized with Milvus backend")
 
-    async def _get_embedding(self, text: str) -> List[float]:
+    async def get_embedding(self, text: str) -> List[float]:
         """Generate embedding for text using embedding model."""
         try:
             if not self.embed_model:
@@ -58,6 +128,15 @@ class MSSearch:
         """Convert vector search results to SearchResult objects."""
         search_results = []
         
+        # Hydrate every hit with one lookup instead of one per result
+        ids = [result.get('id') for result in results]
+        try:
+            fetched = await self.magicscroll.get_ms_entries([i for i in ids if i])
+        except Exception as fetch_err:
+            logger.warning(f"Could not fetch entries: {fetch_err}")
+            fetched = []
+        full_entries = {entry.id: entry for entry in fetched if entry}
+        
         for result in results:
             try:
                 # Get important information from the result
@@ -68,13 +147,8 @@ class MSSearch:
                 created_at = result.get('created_at', datetime.utcnow().isoformat())
                 metadata = result.get('metadata', {})
                 
-                # Try to get the full entry from the store if we have an ID
-                entry = None
-                if entry_id:
-                    try:
-                        entry = await self.magicscroll.get_ms_entry(entry_id)
-                    except Exception as fetch_err:
-                        logger.warning(f"Could not fetch entry {entry_id}: {fetch_err}")
+                # Use the full entry from the store if we have one
+                entry = full_entries.get(entry_id) if entry_id else None
                 
                 # If we have a full entry, use it
                 if entry:
@@ -134,12 +208,48 @@ class MSSearch:
                 
         return search_results
 
+    async def search_many(self, queries: List[str], limit: int = 5) -> List[List[SearchResult]]:
+        """Run several unfiltered searches with one embedding batch and one store call."""
+        try:
+            if not self.embed_model:
+                logger.error("No embedding model available - search will not work!")
+                return [[] for _ in queries]
+                
+            embeddings = await self.embed_model.aget_text_embedding_batch(queries)
+            if any(len(embedding) != self.vector_dim for embedding in embeddings):
+                logger.error("Got invalid embeddings for batched search")
+                return [[] for _ in queries]
+                
+            batches = await self.magicscroll.ms_store.search_unfiltered_many(embeddings, limit=limit)
+            return [[self._row_to_result(row) for row in rows] for rows in batches]
+        except Exception as e:
+            logger.error(f"Batched search failed: {e}")
+            return [[] for _ in queries]
+
+    @staticmethod
+    def _row_to_result(row: Dict[str, Any]) -> SearchResult:
+        """Build a SearchResult from a store search row."""
+        return SearchResult(
+            entry=MSEntry(
+                id=row['id'],
+                content=row['content'],
+                entry_type=entry_type_from_value(row['entry_type']),
+                created_at=row['created_at'],
+                metadata=row['metadata']
+            ),
+            score=row['score'],
+            source='vector',
+            related_entries=[],
+            context={}
+        )
+
     async def search(
         self,
         query: str,
         entry_types: Optional[List[EntryType]] = None,
         temporal_filter: Optional[Dict[str, datetime]] = None,
-        limit: int = 5
+        limit: int = 5,
+        ef_search: Optional[int] = None
     ) -> List[SearchResult]:
         """Main search interface."""
         try:
@@ -154,7 +264,7 @@ class MSSearch:
                 logger.info(f"Temporal filter: {start} to {end}")
             
             # Generate embedding for query
-            query_embedding = await self._get_embedding(query)
+            query_embedding = await self.get_embedding(query)
             
             # If we couldn't get an embedding, return empty results
             if not query_embedding:
@@ -165,12 +275,23 @@ class MSSearch:
                     logger.error(f"Embed batch size: {self.embed_model.embed_batch_size}")
                 return []
             
+            if entry_types is None and temporal_filter is None:
+                # Most searches are unfiltered; build results straight from the
+                # returned rows, skipping filter handling and the per-hit refetch
+                rows = await self.magicscroll.ms_store.search_unfiltered(
+                    query_embedding, limit=limit, ef_search=ef_search
+                )
+                search_results = [self._row_to_result(row) for row in rows]
+                logger.info(f"Search returned {len(search_results)} results")
+                return search_results
+            
             # Perform vector search using Milvus store
             results = await self.magicscroll.ms_store.search_by_vector(
                 query_embedding, 
                 limit=limit,
                 entry_types=entry_types,
-                temporal_filter=temporal_filter
+                temporal_filter=temporal_filter,
+                ef_search=ef_search
             )
             
             # Convert to SearchResult objects
@@ -230,7 +351,7 @@ class MSSearch:
                 logger.info("Attempting direct Milvus search as fallback...")
                 try:
                     # Generate embedding for the query
-                    query_embedding = await self._get_embedding(message)
+                    query_embedding = await self.get_embedding(message)
                     if query_embedding and self.magicscroll.ms_store:
                         # Perform direct search
                         direct_results = await self.magicscroll.ms_store.search_by_vector(
@@ -5,7 +5,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from llama_index.core import Document, Settings
+from llama_index.core import Settings
 
 from .ms_entry import MSEntry, EntryType
 from scramble.config import Config
@@ -151,7 +151,7 @@ class MSSQLiteStore:
             
             # Convert metadata to JSON string
             metadata_json = json.dumps(entry.metadata)
-            created_at_iso = entry.created_at.isoformat()
+            created_at_iso = entry.created_at_iso
             
             # Insert/update entry in the main table
             cursor.execute('''
@@ -218,20 +218,17 @@ class MSSQLiteStore:
             # Parse the row data
             metadata = json.loads(row['metadata'])
             
-            # Convert to Document
-            doc = Document(
-                text=row['content'],
-                doc_id=row['id'],
-                metadata={
+            # Convert straight to MSEntry - no intermediate Document
+            return MSEntry.from_metadata(
+                row['id'],
+                row['content'],
+                {
                     "type": row['entry_type'],
                     "created_at": row['created_at'],
                     **metadata
                 }
             )
             
-            # Convert document to MSEntry
-            return MSEntry.from_document(doc)
-            
         except Exception as e:
             logger.error(f"Error retrieving entry: {e}")
             return None
@@ -378,18 +375,17 @@ class MSSQLiteStore:
             # Process results
             entries = []
             for row in cursor.fetchall():
-                # Convert to Document and then to MSEntry
+                # Convert straight to MSEntry - no intermediate Document
                 metadata = json.loads(row['metadata'])
-                doc = Document(
-                    text=row['content'],
-                    doc_id=row['id'],
-                    metadata={
+                entries.append(MSEntry.from_metadata(
+                    row['id'],
+                    row['content'],
+                    {
                         "type": row['entry_type'],
                         "created_at": row['created_at'],
                         **metadata
                     }
-                )
-                entries.append(MSEntry.from_document(doc))
+                ))
             
             return entries
             
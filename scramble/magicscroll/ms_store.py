@@ -1,22 +1,28 @@
 """Redis storage implementation for MagicScroll using LlamaIndex."""
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import asyncio
+import json
 import logging
+from datetime import datetime, timedelta, timezone
+import numpy as np
 
-from llama_index.core import StorageContext, Document, Settings
+from llama_index.core import StorageContext, Settings
 from llama_index.storage.docstore.redis import RedisDocumentStore
 from llama_index.storage.index_store.redis import RedisIndexStore
 from llama_index.vector_stores.redis import RedisVectorStore
 from llama_index.graph_stores.memgraph import MemgraphPropertyGraphStore
 from llama_index.graph_stores.memgraph import MemgraphGraphStore
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
 
-from .ms_entry import MSEntry
+from .ms_entry import MSEntry, EntryType
 from scramble.config import Config
 from scramble.utils.logging import get_logger
-from redis import Redis
+from redis import Redis, ConnectionPool
 logger = get_logger(__name__)
 
+# Sorted set of entry ids scored by creation time (UTC epoch seconds)
+_TIMESTAMP_KEY = "magicscroll:ts"
+
 class MSStore:
     """Redis storage for MagicScroll using LlamaIndex components."""
     
@@ -80,7 +86,12 @@ class MSStore:
                         
                     # Docker exec will be used by RedisDocumentStore indirectly
                     # For now, just create a regular Redis client
-                    redis_client = Redis(host=redis_host, port=redis_port, decode_responses=True)
+                    redis_client = Redis(connection_pool=ConnectionPool(
+                        host=redis_host,
+                        port=redis_port,
+                        decode_responses=True,
+                        **Config.get_redis_pool_options()
+                    ))
                     
                 except Exception as container_err:
                     logger.error(f"Error using Redis container: {container_err}")
@@ -88,7 +99,14 @@ class MSStore:
             else:
                 # Standard Redis connection
                 try:
-                    redis_client = Redis(host=redis_host, port=redis_port, decode_responses=True, socket_connect_timeout=5.0)
+                    # Bounded pool with health checks, shared by every caller of this store
+                    redis_client = Redis(connection_pool=ConnectionPool(
+                        host=redis_host,
+                        port=redis_port,
+                        decode_responses=True,
+                        socket_connect_timeout=5.0,
+                        **Config.get_redis_pool_options()
+                    ))
                     redis_info = redis_client.info()
                     redis_version = redis_info.get('redis_version', 'unknown')
                     logger.info(f"Connected to Redis version: {redis_version}")
@@ -183,6 +201,9 @@ class MSStore:
                 logger.error(f"Error initializing vector store: {vector_err}")
                 self.vector_store = None
             
+            # Kept for pipelined writes of the vector hashes
+            self.redis_client = redis_client
+            
             logger.info("Redis storage components initialized successfully")
             
         except Exception as e:
@@ -190,6 +211,7 @@ class MSStore:
             # Continue with minimal functionality
             self.doc_store = None
             self.vector_store = None
+            self.redis_client = None
 
         self.graph_store = MemgraphGraphStore(
             url= "bolt://localhost:7687",
@@ -238,31 +260,7 @@ class MSStore:
             
             # DIRECT APPROACH: Skip LlamaIndex vector store and use Redis directly
             try:
-                # Format the embedding for Redis CLI
-                embedding_str = " ".join([str(x) for x in embedding])
-                
-                # Create Redis hash with vector embedding
-                import subprocess
-                import json
-                
-                # Prepare metadata
-                metadata_json = json.dumps(doc.metadata)
-                
-                # Construct Redis key
-                redis_key = f"magicscroll_index:{doc.doc_id}"
-                
-                # Prepare HSET command
-                hset_cmd = [
-                    "docker", "exec", "magicscroll-redis", "redis-cli",
-                    "HSET", redis_key,
-                    "text", doc.text,
-                    "doc_id", doc.doc_id,
-                    "metadata", metadata_json,
-                    "embedding", embedding_str
-                ]
-                
-                # Execute command
-                subprocess.check_output(hset_cmd)
+                await asyncio.to_thread(self._write_vector_hashes, [doc])
                 logger.info(f"✅ Entry {entry.id} stored directly to Redis with vector embedding")
                     
             except Exception as vector_err:
@@ -276,6 +274,45 @@ class MSStore:
             return False
 
 
+    async def save_ms_entries(self, entries: List[MSEntry]) -> bool:
+        """Store several entries with one embedding batch and pipelined Redis writes."""
+        try:
+            docs = [entry.to_document() for entry in entries]
+            embeddings = await self.embed_model.aget_text_embedding_batch([doc.text for doc in docs])
+            for doc, embedding in zip(docs, embeddings):
+                doc.embedding = embedding
+                
+            await self.doc_store.async_add_documents(docs)
+            await asyncio.to_thread(self._write_vector_hashes, docs)
+            logger.info(f"Stored {len(docs)} entries to Redis")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error storing entries: {e}", exc_info=True)
+            return False
+
+    def _write_vector_hashes(self, docs: List[Any], chunk_size: int = 100) -> None:
+        """Write the vector-index hash for each document, one pipeline round trip per chunk."""
+        if self.redis_client is None:
+            raise RuntimeError("Redis client not initialized")
+            
+        for start in range(0, len(docs), chunk_size):
+            pipe = self.redis_client.pipeline(transaction=False)
+            for doc in docs[start:start + chunk_size]:
+                pipe.hset(f"magicscroll_index:{doc.doc_id}", mapping={
+                    "text": doc.text,
+                    "doc_id": doc.doc_id,
+                    "metadata": json.dumps(doc.metadata),
+                    # RediSearch FLOAT32 vector fields take raw little-endian bytes
+                    "embedding": np.asarray(doc.embedding, dtype=np.float32).tobytes()
+                })
+                # Time index for recent-entry lookups, in the same round trip
+                created_ts = datetime.fromisoformat(doc.metadata["created_at"]).replace(
+                    tzinfo=timezone.utc
+                ).timestamp()
+                pipe.zadd(_TIMESTAMP_KEY, {doc.doc_id: created_ts})
+            pipe.execute()
+
     async def get_ms_entry(self, entry_id: str) -> Optional[MSEntry]:
         """Retrieve a MagicScroll entry."""
         try:
@@ -284,18 +321,87 @@ class MSStore:
                 return None
                 
             # Convert while preserving MSEntry's original ID
-            doc = Document(
-                text=stored_doc.get_content(),
-                metadata=stored_doc.metadata,
-                doc_id=entry_id,  
-                embedding=stored_doc.embedding,
+            return MSEntry.from_metadata(
+                entry_id,
+                stored_doc.get_content(),
+                stored_doc.metadata
             )
-
-            return MSEntry.from_document(doc)
         except Exception as e:
             logger.error(f"Error retrieving entry: {e}")
             return None
 
+    async def get_ms_entries(self, entry_ids: List[str]) -> List[Optional[MSEntry]]:
+        """Retrieve several entries with one pipelined round trip, in the order requested."""
+        if not entry_ids:
+            return []
+            
+        try:
+            rows = await asyncio.to_thread(self._read_vector_hashes, entry_ids)
+            return [
+                MSEntry.from_metadata(entry_id, text, json.loads(metadata))
+                if text is not None else None
+                for entry_id, (text, metadata) in zip(entry_ids, rows)
+            ]
+        except Exception as e:
+            logger.error(f"Error retrieving entries: {e}")
+            return [None] * len(entry_ids)
+
+    def _read_vector_hashes(self, entry_ids: List[str]) -> List[Any]:
+        """Read text and metadata from each entry's vector-index hash in one pipeline."""
+        if self.redis_client is None:
+            raise RuntimeError("Redis client not initialized")
+            
+        pipe = self.redis_client.pipeline(transaction=False)
+        for entry_id in entry_ids:
+            # HMGET rather than HGETALL: the raw embedding bytes would not decode
+            pipe.hmget(f"magicscroll_index:{entry_id}", "text", "metadata")
+        return pipe.execute()
+
+
+    async def get_recent_entries(
+        self,
+        hours: Optional[int] = None,
+        entry_types: Optional[List[EntryType]] = None,
+        limit: int = 10
+    ) -> List[MSEntry]:
+        """Get recent entries, newest first, from the time index.
+        
+        A sorted-set range read plus one batched hydration; no vector index
+        or document scan is involved.
+        """
+        if self.redis_client is None:
+            logger.warning("Cannot get recent entries - Redis client not initialized")
+            return []
+            
+        try:
+            min_score = (
+                (datetime.now(timezone.utc) - timedelta(hours=hours)).timestamp()
+                if hours is not None else "-inf"
+            )
+            wanted = {t.value for t in entry_types} if entry_types else None
+            
+            entries: List[MSEntry] = []
+            offset = 0
+            # Without a type filter the first page is the answer; with one,
+            # keep paging until enough entries of the wanted types turn up
+            while len(entries) < limit:
+                ids = await asyncio.to_thread(
+                    self.redis_client.zrevrangebyscore,
+                    _TIMESTAMP_KEY, "+inf", min_score, start=offset, num=limit
+                )
+                if not ids:
+                    break
+                offset += len(ids)
+                for entry in await self.get_ms_entries(ids):
+                    if entry is not None and (wanted is None or entry.entry_type.value in wanted):
+                        entries.append(entry)
+                        
+            logger.info(f"Retrieved {len(entries[:limit])} recent entries")
+            return entries[:limit]
+            
+        except Exception as e:
+            logger.error(f"Error getting recent entries: {e}")
+            return []
 
     async def delete_ms_entry(self, entry_id: str) -> bool:
         """Delete a MagicScroll entry using direct Redis approach."""
@@ -322,6 +428,9 @@ class MSStore:
                 logger.error(f"Error deleting entry from vector store: {vector_err}")
                 # Continue despite vector store error
                 
+            if self.redis_client is not None:
+                await asyncio.to_thread(self.redis_client.zrem, _TIMESTAMP_KEY, entry_id)
+                
             return True
         except Exception as e:
             logger.error(f"Error deleting entry: {e}")
@@ -3,9 +3,12 @@ from typing import Dict, List, Any
 from dataclasses import dataclass
 from .ms_entry import MSEntry
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
-    """Container for search results with source and confidence information."""
+    """Container for search results with source and confidence information.
+
+    Search methods return these directly; callers use attribute access.
+    """
     entry: MSEntry
     score: float
     source: str  # 'graph', 'temporal', 'vector', 'hybrid'
@@ -0,0 +1,79 @@
+"""
+Tests for the embedding caches in ms_embedding.
+
+Covers the on-disk float16 ring (EmbeddingDiskCache) and the in-memory
+LRU wrapper (CachedEmbedding) that sits in front of it.
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import from scramble
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llama_index.core.embeddings import MockEmbedding
+
+from scramble.magicscroll.ms_embedding import CachedEmbedding, EmbeddingDiskCache, content_key
+
+
+def test_disk_cache_survives_reopen(tmp_path):
+    """Vectors written by one instance are read back after close and reopen."""
+    cache = EmbeddingDiskCache(tmp_path, capacity=4, dim=3, model_name="m")
+    key = content_key("apple")
+    cache.put_many([(key, [1.0, 2.0, 3.0])])
+    cache.close()
+
+    reopened = EmbeddingDiskCache(tmp_path, capacity=4, dim=3, model_name="m")
+    assert reopened.get(key) == [1.0, 2.0, 3.0]
+
+
+def test_disk_cache_evicts_oldest_row(tmp_path):
+    """Once the ring is full, new vectors overwrite the oldest ones."""
+    cache = EmbeddingDiskCache(tmp_path, capacity=2, dim=1, model_name="m")
+    keys = [content_key(str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put_many([(key, [float(i)])])
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) == [1.0]
+    assert cache.get(keys[2]) == [2.0]
+
+
+def test_disk_cache_rejects_rows_overwritten_by_another_instance(tmp_path):
+    """Two instances on one directory never return each other's vectors."""
+    first = EmbeddingDiskCache(tmp_path, capacity=4, dim=3, model_name="m")
+    second = EmbeddingDiskCache(tmp_path, capacity=4, dim=3, model_name="m")
+    apple, pear = content_key("apple"), content_key("pear")
+
+    # Both rings start at row 0, so the second write replaces the first
+    first.put_many([(apple, [1.0, 0.0, 0.0])])
+    second.put_many([(pear, [0.0, 1.0, 0.0])])
+
+    assert first.get(apple) is None
+    assert second.get(apple) is None
+    assert second.get(pear) == [0.0, 1.0, 0.0]
+
+
+def test_disk_cache_resets_for_a_different_model(tmp_path):
+    """Vectors from another model are never reused."""
+    cache = EmbeddingDiskCache(tmp_path, capacity=4, dim=3, model_name="m")
+    key = content_key("apple")
+    cache.put_many([(key, [1.0, 2.0, 3.0])])
+    cache.close()
+
+    other = EmbeddingDiskCache(tmp_path, capacity=4, dim=3, model_name="other")
+    assert other.get(key) is None
+
+
+def test_cached_embedding_reads_through_disk_cache(tmp_path):
+    """A fresh in-memory LRU is filled from the disk cache of an earlier run."""
+    disk_cache = EmbeddingDiskCache(tmp_path, capacity=8, dim=4, model_name="unknown")
+    model = CachedEmbedding(MockEmbedding(embed_dim=4), max_size=2, disk_cache=disk_cache)
+    expected = model.get_text_embedding("hello")
+    model.close()
+
+    disk_cache = EmbeddingDiskCache(tmp_path, capacity=8, dim=4, model_name="unknown")
+    warm = CachedEmbedding(MockEmbedding(embed_dim=4), max_size=2, disk_cache=disk_cache)
+    key = content_key("hello")
+    assert disk_cache.get(key) == expected
+    assert warm.get_text_embedding("hello") == expected
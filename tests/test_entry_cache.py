@@ -0,0 +1,87 @@
+"""
+Tests for MagicScroll's entry cache in front of the store.
+
+A dict-backed fake store stands in for Milvus, and counts lookups so
+cache hits can be told apart from store reads.
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import from scramble
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scramble.magicscroll import magic_scroll
+from scramble.magicscroll.magic_scroll import MagicScroll
+from scramble.magicscroll.ms_entry import EntryType, MSEntry
+from scramble.magicscroll.ms_fipa import MSFIPAStorage
+
+
+class _FakeStore:
+    """Keeps entries in a dict, like MSMilvusStore keeps them in a collection."""
+
+    def __init__(self):
+        self.entries = {}
+        self.reads = 0
+
+    async def save_ms_entry(self, entry):
+        self.entries[entry.id] = entry
+        return True
+
+    async def save_ms_entries(self, entries):
+        for entry in entries:
+            self.entries[entry.id] = entry
+        return True
+
+    async def get_ms_entry(self, entry_id):
+        self.reads += 1
+        return self.entries.get(entry_id)
+
+    async def get_ms_entries(self, entry_ids):
+        self.reads += 1
+        return [self.entries[i] for i in entry_ids if i in self.entries]
+
+
+def _scroll(tmp_path, monkeypatch) -> MagicScroll:
+    """A MagicScroll on the fake store, with its FIPA database under tmp_path."""
+    monkeypatch.setattr(magic_scroll, "MSFIPAStorage",
+                        lambda: MSFIPAStorage(str(tmp_path / "fipa.db")))
+    scroll = MagicScroll()
+    scroll.ms_store = _FakeStore()
+    return scroll
+
+
+async def test_repeat_reads_are_served_from_the_cache(tmp_path, monkeypatch):
+    """A second get_ms_entry for the same id does not touch the store."""
+    scroll = _scroll(tmp_path, monkeypatch)
+    entry = MSEntry("first", EntryType.CODE)
+    await scroll.save_ms_entry(entry)
+
+    assert (await scroll.get_ms_entry(entry.id)).content == "first"
+    assert (await scroll.get_ms_entries([entry.id]))[0].content == "first"
+    assert scroll.ms_store.reads == 1
+
+
+async def test_save_ms_entry_replaces_the_cached_entry(tmp_path, monkeypatch):
+    """Saving an entry under a cached id makes the next read return the new one."""
+    scroll = _scroll(tmp_path, monkeypatch)
+    entry = MSEntry("first", EntryType.CODE)
+    await scroll.save_ms_entry(entry)
+    await scroll.get_ms_entry(entry.id)
+
+    await scroll.save_ms_entry(MSEntry("second", EntryType.CODE, id=entry.id))
+
+    assert (await scroll.get_ms_entry(entry.id)).content == "second"
+
+
+async def test_save_ms_entries_replaces_cached_entries(tmp_path, monkeypatch):
+    """A batch save drops every cached entry it overwrites."""
+    scroll = _scroll(tmp_path, monkeypatch)
+    entries = [MSEntry(f"old {i}", EntryType.CODE) for i in range(3)]
+    await scroll.save_ms_entries(entries)
+    await scroll.get_ms_entries([e.id for e in entries])
+
+    await scroll.save_ms_entries([MSEntry("new 1", EntryType.CODE, id=entries[1].id)])
+
+    fetched = await scroll.get_ms_entries([e.id for e in entries])
+    assert [e.content for e in fetched] == ["old 0", "new 1", "old 2"]
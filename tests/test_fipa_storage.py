@@ -0,0 +1,138 @@
+"""
+Tests for MSFIPAStorage, the SQLite store for FIPA messages.
+
+Each test uses its own database file under pytest's tmp_path.
+"""
+
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add parent directory to path to import from scramble
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scramble.magicscroll.ms_fipa import MSFIPAStorage
+
+
+def test_second_instance_can_write_after_save_message(tmp_path):
+    """save_message commits, so another connection to the file is never locked out."""
+    db_path = str(tmp_path / "fipa.db")
+    first = MSFIPAStorage(db_path)
+    second = MSFIPAStorage(db_path)
+
+    conversation_id = first.create_conversation()
+    first.save_message(conversation_id, "user", "model", "hello")
+    second.save_message(conversation_id, "model", "user", "hi")
+
+    assert [m["content"] for m in first.get_conversation_messages(conversation_id)] == ["hello", "hi"]
+    first.close()
+    second.close()
+
+
+def test_save_messages_writes_the_batch_in_order(tmp_path):
+    """save_messages stores every message, and reads return them in input order."""
+    storage = MSFIPAStorage(str(tmp_path / "fipa.db"))
+    conversation_id = storage.create_conversation()
+
+    ids = storage.save_messages(conversation_id, [
+        {"sender": "user", "receiver": "model", "content": "m0"},
+        {"sender": "model", "receiver": "user", "content": "m1",
+         "performative": "REQUEST", "metadata": {"turn": 2}},
+    ] + [
+        # Mixed message types, so the (conversation_id, message_type, timestamp)
+        # index can't hand the rows back grouped by type
+        {"sender": "user", "receiver": "model", "content": f"m{i}",
+         "metadata": {"message_type": ("PERMANENT", "CONTEXT")[i % 2]}}
+        for i in range(2, 8)
+    ])
+
+    messages = storage.get_conversation_messages(conversation_id)
+    assert [m["message_id"] for m in messages] == ids
+    assert [m["content"] for m in messages] == [f"m{i}" for i in range(8)]
+    assert [m["content"] for m in storage.get_filtered_conversation(conversation_id)] == [
+        f"m{i}" for i in range(8)
+    ]
+    assert messages[0]["performative"] == "INFORM"
+    assert messages[0]["metadata"] == {}
+    assert messages[1]["performative"] == "REQUEST"
+    assert messages[1]["metadata"] == {"turn": 2}
+    storage.close()
+
+
+def test_save_messages_rolls_back_a_failed_batch(tmp_path):
+    """A row SQLite rejects mid-batch leaves none of the batch behind."""
+    storage = MSFIPAStorage(str(tmp_path / "fipa.db"))
+    conversation_id = storage.create_conversation()
+
+    with pytest.raises(sqlite3.Error):
+        storage.save_messages(conversation_id, [
+            {"sender": "user", "receiver": "model", "content": "inserted first"},
+            {"sender": "user", "receiver": "model", "content": object()},  # Can't be bound
+        ])
+
+    assert storage.get_conversation_messages(conversation_id) == []
+    storage.close()
+
+
+def test_filtered_conversation_drops_ephemeral_messages_in_sql(tmp_path):
+    """Ephemeral messages are excluded unless asked for, in timestamp order either way."""
+    storage = MSFIPAStorage(str(tmp_path / "fipa.db"))
+    conversation_id = storage.create_conversation()
+    storage.save_message(conversation_id, "user", "model", "permanent", metadata={"message_type": "PERMANENT"})
+    storage.save_message(conversation_id, "system", "all", "context", metadata={"message_type": "EPHEMERAL"})
+    storage.save_message(conversation_id, "model", "user", "untyped")
+
+    filtered = storage.get_filtered_conversation(conversation_id)
+    everything = storage.get_filtered_conversation(conversation_id, include_ephemeral=True)
+
+    assert [m["content"] for m in filtered] == ["permanent", "untyped"]
+    assert [m["content"] for m in everything] == ["permanent", "context", "untyped"]
+    # The generated column stays internal
+    assert "message_type" not in filtered[0]
+    storage.close()
+
+
+def test_existing_database_gains_the_message_type_column(tmp_path):
+    """Databases created before the generated column are migrated on open."""
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE fipa_messages (message_id TEXT PRIMARY KEY, conversation_id TEXT, "
+        "sender TEXT, receiver TEXT, content TEXT, performative TEXT, timestamp TEXT, metadata TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO fipa_messages VALUES ('m1', 'c1', 'a', 'b', 'old context', 'INFORM', "
+        "'2024-01-01T00:00:00', '{\"message_type\": \"EPHEMERAL\"}')"
+    )
+    conn.execute(
+        "INSERT INTO fipa_messages VALUES ('m2', 'c1', 'a', 'b', 'old message', 'INFORM', "
+        "'2024-01-01T00:00:01', '{}')"
+    )
+    conn.commit()
+    conn.close()
+
+    storage = MSFIPAStorage(db_path)
+    assert [m["content"] for m in storage.get_filtered_conversation("c1")] == ["old message"]
+    storage.close()
+
+
+def test_threads_can_share_one_storage(tmp_path):
+    """Concurrent writers on the shared connection all land and commit."""
+    storage = MSFIPAStorage(str(tmp_path / "fipa.db"))
+    conversation_id = storage.create_conversation()
+
+    def write(i):
+        storage.save_message(conversation_id, "user", "model", f"m{i}")
+        storage.save_messages(conversation_id, [{"sender": "model", "receiver": "user", "content": f"r{i}"}])
+        return len(storage.get_conversation_messages(conversation_id))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, range(200)))
+
+    other = MSFIPAStorage(storage.db_path)
+    assert len(other.get_conversation_messages(conversation_id)) == 400
+    other.close()
+    storage.close()
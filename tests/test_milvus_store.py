@@ -0,0 +1,183 @@
+"""
+Tests for the Milvus Lite store.
+
+Each test works on a throwaway database file with placeholder embeddings,
+so no embedding model is loaded.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add parent directory to path to import from scramble
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llama_index.core import Settings
+from llama_index.core.embeddings import MockEmbedding
+from pymilvus import MilvusClient, DataType
+
+from scramble.config import Config
+from scramble.magicscroll import ms_milvus_store
+from scramble.magicscroll.ms_entry import EntryType, MSConversation, MSEntry
+from scramble.magicscroll.ms_milvus_store import MSMilvusStore
+
+
+def _create_legacy_collection(db_path: str, now: datetime) -> None:
+    """Write rows the way stores did before created_ts existed."""
+    client = MilvusClient(db_path)
+    schema = MilvusClient.create_schema(auto_id=False, enable_dynamic_field=True)
+    schema.add_field("id", DataType.INT64, is_primary=True)
+    schema.add_field("vector", DataType.FLOAT_VECTOR, dim=384)
+    index_params = client.prepare_index_params()
+    index_params.add_index(field_name="vector", index_type="HNSW", metric_type="COSINE",
+                           params={"M": 16, "efConstruction": 200})
+    client.create_collection("conversations", schema=schema, index_params=index_params)
+    rows = [
+        {"id": i, "vector": [0.5] * 384, "orig_id": f"entry-{i}", "content": f"User: {i}",
+         "entry_type": "conversation", "created_at": (now - timedelta(minutes=i)).isoformat(),
+         "metadata": "{}"}
+        for i in range(3)
+    ]
+    rows.append({"id": 9, "vector": [0.5] * 384, "orig_id": "old", "content": "old",
+                 "entry_type": "code", "created_at": (now - timedelta(days=3)).isoformat(),
+                 "metadata": "{}"})
+    client.insert("conversations", rows)
+    client.close()
+
+
+async def test_time_filters_cover_rows_written_before_created_ts(tmp_path):
+    """Legacy rows are backfilled, so time filters still find them."""
+    Settings.embed_model = MockEmbedding(embed_dim=384)
+    db_path = str(tmp_path / "legacy.db")
+    now = datetime.utcnow()
+    _create_legacy_collection(db_path, now)
+
+    try:
+        store = await MSMilvusStore.create(db_path)
+        hits = await store.search_by_vector(
+            [0.5] * 384, limit=10, temporal_filter={'start': now - timedelta(hours=1)}
+        )
+        assert len(hits) == 3
+        assert await store.count_by_type(1) == {"conversation": 3}
+        assert await store.count_by_type() == {"conversation": 3, "code": 1}
+    finally:
+        MSMilvusStore.close_shared_clients()
+
+
+async def test_time_filters_fall_back_to_created_at_without_backfill(tmp_path, monkeypatch):
+    """If the backfill cannot run, the created_at string filter still applies."""
+    Settings.embed_model = MockEmbedding(embed_dim=384)
+    db_path = str(tmp_path / "legacy.db")
+    now = datetime.utcnow()
+    _create_legacy_collection(db_path, now)
+    monkeypatch.setattr(MSMilvusStore, "_backfill_created_ts", lambda self: None)
+
+    try:
+        store = await MSMilvusStore.create(db_path)
+        assert db_path not in ms_milvus_store._created_ts_paths
+        hits = await store.search_by_vector(
+            [0.5] * 384, limit=10, temporal_filter={'start': now - timedelta(hours=1)}
+        )
+        assert len(hits) == 3
+        assert await store.count_by_type(1) == {"conversation": 3}
+    finally:
+        MSMilvusStore.close_shared_clients()
+
+
+async def test_failed_insert_does_not_hang_the_save_pipeline(tmp_path, monkeypatch):
+    """A consumer failure stops the producer instead of leaving it blocked on the queue."""
+    Settings.embed_model = MockEmbedding(embed_dim=384)
+    monkeypatch.setattr(Config, "EMBED_PIPELINE_BATCH", 2)
+    try:
+        store = await MSMilvusStore.create(str(tmp_path / "pipeline.db"))
+
+        def failing_insert(**kwargs):
+            raise RuntimeError("insert failed")
+
+        monkeypatch.setattr(store.client, "insert", failing_insert)
+        entries = [MSConversation(content=f"User: {i}") for i in range(20)]
+        assert await asyncio.wait_for(store.save_ms_entries(entries), timeout=30) is False
+    finally:
+        MSMilvusStore.close_shared_clients()
+
+
+async def test_recent_entries_are_the_newest_rows(tmp_path):
+    """get_recent_entries picks the newest rows across the whole collection, newest first."""
+    Settings.embed_model = MockEmbedding(embed_dim=384)
+    now = datetime.utcnow()
+    # Inserted oldest-first and spread over several scan batches
+    ages = range(2500, -1, -1)
+    entries = [
+        MSEntry(f"age {age}", EntryType.CODE if age % 2 else EntryType.CONVERSATION,
+                created_at=now - timedelta(minutes=age))
+        for age in ages
+    ]
+    try:
+        store = await MSMilvusStore.create(str(tmp_path / "recent.db"))
+        assert await store.save_ms_entries(entries)
+
+        recent = await store.get_recent_entries(limit=3)
+        assert [e.content for e in recent] == ["age 0", "age 1", "age 2"]
+
+        recent_code = await store.get_recent_entries(entry_types=[EntryType.CODE], limit=2)
+        assert [e.content for e in recent_code] == ["age 1", "age 3"]
+    finally:
+        MSMilvusStore.close_shared_clients()
+
+
+async def test_entry_errors_are_reported_not_raised(tmp_path, monkeypatch):
+    """A lost connection or a row without created_at fails the call instead of raising."""
+    Settings.embed_model = MockEmbedding(embed_dim=384)
+    try:
+        store = await MSMilvusStore.create(str(tmp_path / "errors.db"))
+
+        def lost_connection(**kwargs):
+            raise ConnectionError("connection reset")
+
+        monkeypatch.setattr(store.client, "insert", lost_connection)
+        assert await store.save_ms_entry(MSConversation(content="User: hi")) is False
+
+        def legacy_row(**kwargs):
+            return [{"id": 1, "orig_id": "old", "content": "old", "entry_type": "code",
+                     "created_at": None, "metadata": "{}"}]
+
+        monkeypatch.setattr(store.client, "query", legacy_row)
+        assert await store.get_ms_entry("old") is None
+        assert await store.get_ms_entries(["old"]) == [None]
+    finally:
+        MSMilvusStore.close_shared_clients()
+
+
+async def test_recent_entries_scan_only_a_recent_window(tmp_path, monkeypatch):
+    """Old rows outside the window that already holds `limit` rows are never scanned."""
+    Settings.embed_model = MockEmbedding(embed_dim=384)
+    now = datetime.utcnow()
+    entries = [MSEntry(f"old {i}", EntryType.CODE, created_at=now - timedelta(days=30, minutes=i))
+               for i in range(500)]
+    entries += [MSEntry(f"new {i}", EntryType.CODE, created_at=now - timedelta(minutes=i))
+                for i in range(5)]
+    scanned = []
+    iter_rows = MSMilvusStore._iter_rows
+
+    def counting_iter_rows(self, expr, output_fields):
+        for row in iter_rows(self, expr, output_fields):
+            scanned.append(row)
+            yield row
+
+    monkeypatch.setattr(MSMilvusStore, "_iter_rows", counting_iter_rows)
+    try:
+        store = await MSMilvusStore.create(str(tmp_path / "window.db"))
+        assert await store.save_ms_entries(entries)
+
+        recent = await store.get_recent_entries(limit=3)
+        assert [e.content for e in recent] == ["new 0", "new 1", "new 2"]
+        assert len(scanned) == 5
+
+        # Too few rows in the first window widens it until the old rows are in
+        scanned.clear()
+        recent = await store.get_recent_entries(limit=7)
+        assert [e.content for e in recent] == ["new 0", "new 1", "new 2", "new 3", "new 4",
+                                               "old 0", "old 1"]
+    finally:
+        MSMilvusStore.close_shared_clients()
@@ -0,0 +1,56 @@
+"""
+Tests for MSEntry's msgpack encoding (pack/unpack and the batch variants).
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add parent directory to path to import from scramble
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scramble.magicscroll import ms_entry
+from scramble.magicscroll.ms_entry import EntryType, MSEntry
+
+
+def _entry(content: str) -> MSEntry:
+    """An entry with nested metadata and microsecond timestamps."""
+    return MSEntry(content, EntryType.CODE, metadata={"lang": "py", "lines": [1, 2]},
+                   created_at=datetime(2024, 5, 6, 7, 8, 9, 123456))
+
+
+def _assert_same(decoded: MSEntry, original: MSEntry) -> None:
+    """Compare every packed field, since MSEntry equality only checks id."""
+    assert decoded.id == original.id
+    assert decoded.content == original.content
+    assert decoded.entry_type is original.entry_type
+    assert decoded.created_at == original.created_at
+    assert decoded.metadata == original.metadata
+
+
+def test_pack_round_trip():
+    """unpack() rebuilds every field written by pack()."""
+    pytest.importorskip("msgpack")
+    original = _entry("print('hi')")
+    _assert_same(MSEntry.unpack(original.pack()), original)
+
+
+def test_pack_many_round_trip():
+    """unpack_many() returns the entries in the order pack_many() wrote them."""
+    pytest.importorskip("msgpack")
+    originals = [_entry(f"line {i}") for i in range(3)]
+    decoded = MSEntry.unpack_many(MSEntry.pack_many(originals))
+    assert len(decoded) == 3
+    for got, expected in zip(decoded, originals):
+        _assert_same(got, expected)
+
+
+def test_pack_without_msgpack_raises_import_error(monkeypatch):
+    """Without msgpack installed, pack() and unpack() say how to get it."""
+    monkeypatch.setattr(ms_entry, "msgpack", None)
+    with pytest.raises(ImportError, match="pip install msgpack"):
+        _entry("x").pack()
+    with pytest.raises(ImportError, match="pip install msgpack"):
+        MSEntry.unpack(b"")
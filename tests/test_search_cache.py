@@ -0,0 +1,80 @@
+"""
+Tests for SemanticSearchCache, the embedding-keyed search result cache.
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import from scramble
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scramble.magicscroll import ms_search
+from scramble.magicscroll.ms_search import SemanticSearchCache
+
+
+class _Clock:
+    """Stands in for time.monotonic so TTLs can be tested without sleeping."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_similar_query_hits_and_dissimilar_query_misses():
+    """Queries above the cosine threshold reuse results; others do not."""
+    cache = SemanticSearchCache(threshold=0.95, ttl=60, max_size=4)
+    cache.put([1.0, 0.0, 0.0], "params", ["result"])
+
+    assert cache.get([1.0, 0.05, 0.0], "params") == ["result"]
+    assert cache.get([0.0, 1.0, 0.0], "params") is None
+
+
+def test_different_search_parameters_miss():
+    """A similar query with other parameters is a miss."""
+    cache = SemanticSearchCache(threshold=0.95, ttl=60, max_size=4)
+    cache.put([1.0, 0.0], ("search", 5), ["five"])
+
+    assert cache.get([1.0, 0.0], ("search", 10)) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    """Results older than the TTL are not returned."""
+    clock = _Clock()
+    monkeypatch.setattr(ms_search.time, "monotonic", clock)
+    cache = SemanticSearchCache(threshold=0.95, ttl=60, max_size=4)
+    cache.put([1.0, 0.0], "params", ["result"])
+
+    clock.now += 59
+    assert cache.get([1.0, 0.0], "params") == ["result"]
+    clock.now += 2
+    assert cache.get([1.0, 0.0], "params") is None
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    """When full, the entry looked up least recently is replaced."""
+    clock = _Clock()
+    monkeypatch.setattr(ms_search.time, "monotonic", clock)
+    cache = SemanticSearchCache(threshold=0.99, ttl=600, max_size=2)
+    cache.put([1.0, 0.0, 0.0], "params", ["x"])
+    clock.now += 1
+    cache.put([0.0, 1.0, 0.0], "params", ["y"])
+    clock.now += 1
+    assert cache.get([1.0, 0.0, 0.0], "params") == ["x"]  # y is now least recent
+
+    clock.now += 1
+    cache.put([0.0, 0.0, 1.0], "params", ["z"])
+
+    assert cache.get([0.0, 1.0, 0.0], "params") is None
+    assert cache.get([1.0, 0.0, 0.0], "params") == ["x"]
+    assert cache.get([0.0, 0.0, 1.0], "params") == ["z"]
+
+
+def test_clear_drops_everything():
+    """clear() empties the cache."""
+    cache = SemanticSearchCache(threshold=0.95, ttl=60, max_size=4)
+    cache.put([1.0, 0.0], "params", ["result"])
+    cache.clear()
+
+    assert cache.get([1.0, 0.0], "params") is None
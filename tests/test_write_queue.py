@@ -0,0 +1,80 @@
+"""
+Tests for MagicScroll's write buffer (queue_ms_entry and its flusher).
+
+A dict-backed fake store stands in for Milvus and records each save call,
+so coalesced batches can be told apart from single writes.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add parent directory to path to import from scramble
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scramble.magicscroll import magic_scroll
+from scramble.magicscroll.magic_scroll import MagicScroll
+from scramble.magicscroll.ms_entry import EntryType, MSEntry
+from scramble.magicscroll.ms_fipa import MSFIPAStorage
+
+
+class _FakeStore:
+    """Keeps entries in a dict and records the size of every save."""
+
+    def __init__(self):
+        self.entries = {}
+        self.saves = []
+
+    async def save_ms_entry(self, entry):
+        self.saves.append(1)
+        self.entries[entry.id] = entry
+        return True
+
+    async def save_ms_entries(self, entries):
+        self.saves.append(len(entries))
+        for entry in entries:
+            self.entries[entry.id] = entry
+        return True
+
+
+def _scroll(tmp_path, monkeypatch) -> MagicScroll:
+    """A MagicScroll on the fake store with its flusher running, as initialize() leaves it."""
+    monkeypatch.setattr(magic_scroll, "MSFIPAStorage",
+                        lambda: MSFIPAStorage(str(tmp_path / "fipa.db")))
+    scroll = MagicScroll()
+    scroll.ms_store = _FakeStore()
+    scroll._write_queue = asyncio.Queue()
+    scroll._write_flusher = asyncio.create_task(scroll._flush_writes())
+    return scroll
+
+
+async def test_concurrent_queued_writes_share_one_save(tmp_path, monkeypatch):
+    """Writes queued together are stored with one save_ms_entries call."""
+    scroll = _scroll(tmp_path, monkeypatch)
+    entries = [MSEntry(f"entry {i}", EntryType.CODE) for i in range(5)]
+
+    ids = await asyncio.gather(*(scroll.queue_ms_entry(entry) for entry in entries))
+
+    assert ids == [entry.id for entry in entries]
+    assert scroll.ms_store.saves == [5]
+    await asyncio.wait_for(scroll.close(), timeout=5)
+
+
+async def test_close_does_not_wait_on_a_dead_flusher(tmp_path, monkeypatch):
+    """If the flusher has died, close() saves what is left in the queue itself."""
+    scroll = _scroll(tmp_path, monkeypatch)
+    scroll._write_flusher.cancel()
+    await asyncio.sleep(0)
+
+    # Writes made after the flusher died skip the buffer
+    direct = MSEntry("direct", EntryType.CODE)
+    assert await scroll.queue_ms_entry(direct) == direct.id
+
+    # One that was already queued is stranded until close()
+    stranded = MSEntry("stranded", EntryType.CODE)
+    done = asyncio.get_running_loop().create_future()
+    scroll._write_queue.put_nowait((stranded, done))
+
+    await asyncio.wait_for(scroll.close(), timeout=5)
+    assert done.result() == stranded.id
+    assert set(scroll.ms_store.entries) == {direct.id, stranded.id}